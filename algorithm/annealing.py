@@ -1,11 +1,26 @@
+import copy
 import functools
 import math
 import random
+import time
 import typing
+from collections import deque
 from abc import ABC, abstractmethod
 from enum import Enum
 
-from algorithm.cooling_schedule import CoolingSchedule, CoolingScheduleType, CoolingStatusType
+import numpy as np
+
+from algorithm.best import BestSolution
+from algorithm.cooling_schedule import ADAPTIVE_COOLING_SCHEDULES, CoolingSchedule, CoolingScheduleType, \
+    CoolingStatusType
+from algorithm.epoch_length import EpochLength
+from algorithm.history import History
+from algorithm.metrics import Metrics
+from algorithm.settings import TemperatureEstimation
+from algorithm.trace import Trace
+
+RANDOM_BLOCK_SIZE = 2 ** 12  # number of acceptance thresholds drawn at once
+DEADLINE_CHECK_STEPS = 2 ** 10  # time budget is checked every DEADLINE_CHECK_STEPS steps of a state
 
 
 class Solver(ABC):
@@ -18,19 +33,35 @@ class SolutionStatusType(Enum):
     REJECTED = 2
 
 
+class EnergyVerificationError(ArithmeticError):
+    pass
+
+
+class Progress(typing.NamedTuple):
+    k: int
+    temperature: float
+    energy: float
+    best_energy: float
+    evaluations: int
+    elapsed_time: float
+
+
 class Solution:
     """
     if solution is non-improver, status parameter will be SolutionStatusType.CANDIDATE
+    move is the change that produced this solution from the current solution, e.g. (index_1, index_2) for a swap.
     """
     status = SolutionStatusType.CANDIDATE  # type: SolutionStatusType
 
     def __init__(self,
                  plan,
                  energy=None,  # type: float
+                 move=None,  # type: typing.Optional[tuple]
                  *args, **kwargs):
         super(Solution, self).__init__(*args, **kwargs)
         self.plan = plan
         self.energy = energy
+        self.move = move
         self.status = SolutionStatusType.CANDIDATE
 
     def calculate_energy(self,
@@ -74,6 +105,30 @@ class ObjectiveFunction:
         """
         pass
 
+    def objective_function_variation(
+            self,
+            move,  # type: tuple
+            *args, **kwargs
+    ) -> typing.Optional[float]:
+        """
+        :param move: move that will be applied to the current solution
+        :return energy_variation: energy variation calculated from the parts of the plan changed by the move,
+        None if it can't be calculated incrementally.
+        """
+        return None
+
+    @abstractmethod
+    def objective_function_variations(
+            self,
+            moves,  # type: np.ndarray
+            *args, **kwargs
+    ) -> np.ndarray:
+        """
+        :param moves: moves from generate_move_batch, all of them on the current solution
+        :return energy_variations: energy variation of each move
+        """
+        pass
+
 
 class SolutionGeneratorStatusType(Enum):
     STOPPED = 1
@@ -107,6 +162,54 @@ class SolutionGenerator:
         """
         pass
 
+    def generate_move(
+            self,
+            data,
+            *args, **kwargs
+    ) -> typing.Optional[tuple]:
+        """
+        :param data: data
+        :return move: a move on the current solution, e.g. (index_1, index_2) for a swap. None if the solver
+        generates new solutions with generate_solution instead of moves.
+        """
+        return None
+
+    def generate_move_batch(
+            self,
+            size,  # type: int
+            *args, **kwargs
+    ) -> typing.Optional[np.ndarray]:
+        """
+        :param size: number of moves
+        :return moves: (size, move length) integer array of moves on the current solution, None if the solver
+        doesn't generate moves in batches.
+        """
+        return None
+
+    def sample_move(
+            self,
+            random_generator,  # type: random.Random
+            *args, **kwargs
+    ) -> typing.Optional[tuple]:
+        """
+        :param random_generator: used instead of the random generators and the move generator of the solver, so
+        sampling doesn't change the run
+        :return move: a random move on the current solution, None if the solver can't sample moves
+        """
+        return None
+
+    @abstractmethod
+    def apply_move(
+            self,
+            plan,
+            move,  # type: tuple
+    ):
+        """
+        :param plan: plan that will be changed in place
+        :param move: move that is generated by generate_move
+        """
+        pass
+
 
 class State:
     def __init__(self,
@@ -114,26 +217,23 @@ class State:
                  old_solutions=False,  # type: bool
                  *args, **kwargs):
         super(State, self).__init__(*args, **kwargs)
-        self.solution_list = list()  # type: typing.List[Solution]
+        self.solution_list = deque()  # type: typing.Deque[Solution]
         self.temperature = temperature
         self.old_solutions = old_solutions
-
-    @property
-    def thermal_equilibrium(self) -> bool:
-        return next(iter(solution.accepted for solution in self.solution_list), None)
+        self.thermal_equilibrium = False  # type: bool
 
     @property
     def status(self) -> SolutionStatusType:
-        return next(iter(solution.status for solution in self.solution_list), None)
+        return self.solution_list[0].status if self.solution_list else None
 
     @property
     def solution(self) -> Solution:
-        return next(iter(solution for solution in self.solution_list), None)
+        return self.solution_list[0] if self.solution_list else None
 
     def is_initial(self,
                    solver,  # type: SMA
                    ):
-        return self == solver.initial_state
+        return self is solver.initial_state
 
     def stopped(self,
                 solver,  # type: SMA
@@ -144,11 +244,10 @@ class State:
                      solution,  # type: Solution
                      ) -> bool:
         if not self.thermal_equilibrium:
-            if self.old_solutions:
-                self.solution_list.insert(0, solution)
-            else:
-                self.solution_list.insert(0, solution)
-                self.solution_list = self.solution_list[0:2]
+            self.solution_list.appendleft(solution)
+            if not self.old_solutions and len(self.solution_list) > 2:
+                self.solution_list.pop()
+            self.thermal_equilibrium = solution.accepted
             return True
         else:
             return False
@@ -167,25 +266,80 @@ class SMA(Solver, ABC, ObjectiveFunction, SolutionGenerator, CoolingSchedule):
             initial_solution=None,  # type: Solution
             old_states=False,  # type: bool
             old_solutions=False,  # type: bool
+            verify_energy=False,  # type: bool
+            history=None,  # type: typing.Optional[History]
+            epoch_length=None,  # type: typing.Optional[EpochLength]
+            temperature_estimation=None,  # type: typing.Optional[TemperatureEstimation]
+            seed=None,  # type: typing.Optional[int]
+            batch_size=0,  # type: int
+            time_budget=None,  # type: typing.Optional[float]
+            evaluation_budget=None,  # type: typing.Optional[int]
+            callback=None,  # type: typing.Optional[typing.Callable[[Progress], typing.Optional[bool]]]
+            polish_steps=0,  # type: int
+            metrics=None,  # type: typing.Optional[Metrics]
+            trace=None,  # type: typing.Optional[Trace]
             *args, **kwargs
     ):
+        """
+        :param old_states: keeps every state, accepted plans are copied.
+        :param old_solutions: keeps every candidate of each state.
+        :param history: records each step in bounded buffers, lighter alternative to old_states and old_solutions.
+        :param epoch_length: sets steps of each temperature, steps is used for every temperature if not given.
+        :param temperature_estimation: estimates initial_temperature and temperature_min that are None when solve
+        starts.
+        :param seed: seed of the random generators of the solver, runs with the same seed give the same result.
+        :param batch_size: if the solver generates move batches, up to batch_size moves are evaluated at once and the
+        first accepted one is applied. first batch of a state is as large as the steps of the previous state, each
+        next one is twice as large.
+        :param time_budget: seconds of solve, logarithmic, geometric and exponential schedules are stretched to reach
+        temperature_min when the budget runs out.
+        :param evaluation_budget: number of evaluated solutions of solve, schedules are stretched as for time_budget.
+        :param callback: called with Progress after each temperature, solve stops if it returns True.
+        :param polish_steps: after annealing, random moves from the best solution are applied if they decrease energy
+        until polish_steps moves in a row don't, 0 disables.
+        :param metrics: counters and timers of each temperature, they are sent to the sinks of metrics.
+        :param trace: records the moves of accepted solutions with periodic plan keyframes, frames of the run can be
+        rendered from it after solve.
+        """
         super(SMA, self).__init__(
             temperature=initial_temperature,
             temperature_min=temperature_min,
             cooling_speed=cooling_speed,
             cooling_schedule_type=cooling_schedule_type,
             *args, **kwargs)
-        self.state_list = list()  # type: typing.List[State]
+        self.state_list = deque()  # type: typing.Deque[State]
+        self.current_state = None  # type: typing.Optional[State]
+        self.current_solution = None  # type: typing.Optional[Solution]
         self.data = data
         self.steps = steps
         self.old_states = old_states
         self.old_solutions = old_solutions
+        self.verify_energy = verify_energy
+        self.history = history
+        self.epoch_length = epoch_length
+        self.temperature_estimation = temperature_estimation
+        self.random = random.Random()  # type: random.Random
+        self.generator = None  # type: typing.Optional[np.random.Generator]
+        self.thresholds = []  # type: typing.List[float]
+        self.threshold_index = 0  # type: int
+        self.reseed(seed=seed)
+        self.batch_size = batch_size
+        self.batch_steps = 1  # type: int
+        self.time_budget = time_budget
+        self.evaluation_budget = evaluation_budget
+        self.callback = callback
+        self.evaluations = 0  # type: int
+        self.start_time = None  # type: typing.Optional[float]
+        self.polish_steps = polish_steps
+        self.metrics = metrics
+        self.trace = trace
+        self.best = BestSolution()  # type: BestSolution
         initial_state = self.create_and_add_new_state()
         if not initial_solution:
             initial_solution = self.generate_initial_solution(data=self.data)
         initial_solution.calculate_energy(solver=self)
         initial_solution.accept()
-        initial_state.add_solution(solution=initial_solution)
+        self.add_solution(solution=initial_solution, state=initial_state)
 
     @abstractmethod
     def stopping_criteria(self) -> bool:
@@ -198,9 +352,9 @@ class SMA(Solver, ABC, ObjectiveFunction, SolutionGenerator, CoolingSchedule):
         state.old_solutions = self.old_solutions
         if not self.state_list or not self.incomplete_state:
             if self.old_states:
-                self.state_list.insert(0, state)
+                self.state_list.appendleft(state)
             else:
-                self.state_list = [state, self.state] if self.state_list else [state]
+                self.state_list = deque([state, self.state] if self.state_list else [state])
             return True
         else:
             return False
@@ -222,33 +376,128 @@ class SMA(Solver, ABC, ObjectiveFunction, SolutionGenerator, CoolingSchedule):
 
     @property
     def state(self):
-        a = next(
-            (state_i for state_i in self.state_list if state_i.thermal_equilibrium),
-            self.initial_state)
-        return a
+        """
+        last state that achieved thermal equilibrium.
+        """
+        return self.current_state or self.initial_state
 
     @property
     def solution(self):
-        return self.state.solution
+        return self.current_solution
 
     @property
     def energy(self):
-        return self.solution.energy
+        return self.current_solution.energy
+
+    @property
+    def best_solution(self) -> Solution:
+        """
+        best accepted solution of the run, the current solution is usually worse after uphill moves.
+        """
+        return Solution(plan=self.best.best_plan(solver=self), energy=self.best.energy)
+
+    def add_solution(self,
+                     solution,  # type: Solution
+                     state=None,  # type: typing.Optional[State]
+                     ) -> bool:
+        """
+        adds solution to the incomplete state, accepted solution becomes the current solution.
+        """
+        state = state or self.incomplete_state
+        if state.add_solution(solution=solution) and solution.accepted:
+            self.current_state, self.current_solution = state, solution
+            self.best.record(solver=self, solution=solution)
+            if self.trace is not None:
+                self.trace.record(solver=self, solution=solution)
+            return True
+        return False
 
     def comparison_of_solutions(
             self,
-            new_energy
+            new_energy=None,  # type: float
+            new_solution=None,  # type: Solution
     ):
         """
         Parameters:
         :param new_energy: energy that is the result of objective function which calculated with new solution
+        :param new_solution: new solution, if it carries a move energy variation is calculated from the move only.
         :return energy_var: energy_variation=new_energy-self.energy
         if energy_variation ( ∆energy ) is positive or zero, we will use metropolis acceptance criterion
         """
+        if new_solution is not None:
+            energy_variation = None
+            if new_solution.move is not None:
+                energy_variation = self.objective_function_variation(move=new_solution.move)
+            if energy_variation is None:
+                new_solution.calculate_energy(solver=self)
+            else:
+                new_solution.energy = self.energy + energy_variation
+                if self.verify_energy:
+                    self.verify_solution_energy(solution=new_solution)
+            new_energy = new_solution.energy
 
         energy_variation = new_energy - self.energy
         return energy_variation
 
+    def move_solution(
+            self,
+            move,  # type: tuple
+    ) -> Solution:
+        """
+        applies move to a copy of the current plan.
+        """
+        plan = copy.copy(self.solution.plan)
+        self.apply_move(plan, move)
+        return Solution(plan=plan, move=move)
+
+    def verify_solution_energy(
+            self,
+            solution,  # type: Solution
+    ):
+        """
+        recalculates energy with objective function and compares it with the incrementally calculated energy.
+        """
+        if solution.plan is None:
+            solution.plan = self.move_solution(move=solution.move).plan
+        energy = self.objective_function(solution=solution)
+        if not math.isclose(energy, solution.energy, rel_tol=1e-6, abs_tol=1e-6):
+            raise EnergyVerificationError(
+                "incremental energy %f doesn't match objective function energy %f for move %s" %
+                (solution.energy, energy, solution.move))
+        solution.energy = energy
+
+    def reseed(self,
+               seed=None,  # type: typing.Optional[int]
+               ):
+        """
+        moves are drawn from self.random, acceptance thresholds from self.generator.
+        """
+        self.random.seed(seed)
+        self.generator = np.random.default_rng(seed)
+        self.thresholds, self.threshold_index = [], 0
+
+    def acceptance_threshold(self) -> float:
+        """
+        -ln(u) of a uniform u, thresholds are drawn in blocks of RANDOM_BLOCK_SIZE.
+        """
+        if self.threshold_index == len(self.thresholds):
+            self.thresholds, self.threshold_index = self.generator.standard_exponential(RANDOM_BLOCK_SIZE).tolist(), 0
+        threshold = self.thresholds[self.threshold_index]
+        self.threshold_index += 1
+        return threshold
+
+    def peek_acceptance_thresholds(self,
+                                   count,  # type: int
+                                   ) -> np.ndarray:
+        """
+        next count thresholds without using them, threshold_index is advanced by the caller.
+        """
+        if self.threshold_index + count > len(self.thresholds):
+            self.thresholds = self.thresholds[self.threshold_index:] + self.generator.standard_exponential(
+                max(RANDOM_BLOCK_SIZE, count)).tolist()
+            self.threshold_index = 0
+        return np.array(self.thresholds[self.threshold_index:self.threshold_index + count])
+
     def metropolis_acceptance_criterion(self, energy_variation):
         """
         calculate acceptance
@@ -257,26 +506,136 @@ class SMA(Solver, ABC, ObjectiveFunction, SolutionGenerator, CoolingSchedule):
         :param energy_variation: energy_variation if energy_variation is positive or zero.
         if energy_variation is close to T, the probability of being accepted increases.
         :return acceptance: if true, we will accept new solution.
-        test:
-        ---------
-        j = 0
-        T = 10
-        for i in range(10000):
-            a = metropolis_acceptance_criterion(75)
-            if a[2]:
-                j+=1
-                print(math.ceil(a[0]), math.ceil(a[1]), )
-        print(j)
-        """
-        random_number = random.uniform(0, 1)
-        acceptance = random_number <= math.exp(-energy_variation / self.temperature)
-        return acceptance
+        u <= exp(-∆E/T) is evaluated as ∆E <= T*(-ln(u)), so exp is not calculated.
+        """
+        return energy_variation <= self.temperature * self.acceptance_threshold()
+
+    def move_energy_variation(
+            self,
+            move,  # type: tuple
+    ) -> float:
+        energy_variation = self.objective_function_variation(move=move)
+        if energy_variation is None:
+            new_solution = self.move_solution(move=move)
+            energy_variation = new_solution.calculate_energy(solver=self) - self.energy
+        elif self.verify_energy:
+            new_solution = Solution(plan=None, energy=self.energy + energy_variation, move=move)
+            self.verify_solution_energy(solution=new_solution)
+            energy_variation = new_solution.energy - self.energy
+        return energy_variation
+
+    def objective_function_variations(
+            self,
+            moves,  # type: np.ndarray
+            *args, **kwargs
+    ) -> np.ndarray:
+        """
+        evaluates the moves one by one with move_energy_variation, solvers override it with a vectorized version.
+        """
+        return np.array([self.move_energy_variation(move=tuple(move)) for move in moves.tolist()], dtype=np.float64)
+
+    def accept_move(
+            self,
+            move,  # type: tuple
+            energy_variation,  # type: float
+    ):
+        """
+        applies accepted move to the current plan in place. plan is copied only if the current state is kept,
+        which is the case for the initial state and for old states.
+        """
+        plan = self.solution.plan
+        if self.old_states or self.state.is_initial(solver=self):
+            plan = copy.copy(plan)
+        self.apply_move(plan, move)
+        new_solution = Solution(plan=plan, energy=self.energy + energy_variation, move=move)
+        new_solution.accept()
+        self.add_solution(new_solution)
 
     def thermal_equilibrium_achievement(self):
+        move = self.generate_move(data=self.data)
+        if move is None:
+            self.solution_equilibrium_achievement()
+        elif self.solution_generator_status == SolutionGeneratorStatusType.CONTINUE:
+            energy_variation = self.move_energy_variation(move=move)
+            new_energy = self.energy + energy_variation
+            accepted = energy_variation <= 0 or self.metropolis_acceptance_criterion(energy_variation=energy_variation)
+            if accepted:
+                self.accept_move(move=move, energy_variation=energy_variation)
+            elif self.old_solutions:
+                new_solution = Solution(plan=None, energy=new_energy, move=move)
+                new_solution.reject()
+                self.add_solution(new_solution)
+            if self.statistics is not None:
+                self.statistics.record(energy=self.energy, accepted=accepted)
+            if self.history is not None:
+                self.record_history(energy=new_energy, accepted=accepted, move=move)
+
+    def thermal_equilibrium_batch(self,
+                                  size,  # type: int
+                                  ) -> int:
+        """
+        evaluates a batch of moves on the current solution and accepts the first one that passes metropolis
+        criterion. a state ends with its first accepted solution, so the moves after it wouldn't be evaluated one by
+        one either, thresholds are only used for the uphill moves before it.
+        :return steps: number of moves up to and including the accepted one
+        """
+        moves = self.generate_move_batch(size=size)
+        if moves is None:
+            self.thermal_equilibrium_achievement()
+            return 1
+        energy_variations = self.objective_function_variations(moves=moves)
+        uphill = energy_variations > 0
+        accepted = ~uphill
+        accepted[uphill] = energy_variations[uphill] <= self.temperature * self.peek_acceptance_thresholds(
+            count=int(uphill.sum()))
+        steps = int(accepted.argmax()) + 1 if accepted.any() else len(moves)
+        self.threshold_index += int(uphill[:steps].sum())
+        if self.statistics is not None or self.history is not None or self.old_solutions:
+            for index in range(steps - 1):
+                self.record_rejected_move(move=tuple(moves[index].tolist()), energy_variation=energy_variations[index])
+        if accepted[steps - 1]:
+            move, energy_variation = tuple(moves[steps - 1].tolist()), float(energy_variations[steps - 1])
+            if self.verify_energy:
+                self.verify_batch_energy_variation(move=move, energy_variation=energy_variation)
+            new_energy = self.energy + energy_variation
+            self.accept_move(move=move, energy_variation=energy_variation)
+            if self.statistics is not None:
+                self.statistics.record(energy=self.energy, accepted=True)
+            if self.history is not None:
+                self.record_history(energy=new_energy, accepted=True, move=move)
+        elif self.statistics is not None or self.history is not None or self.old_solutions:
+            self.record_rejected_move(move=tuple(moves[steps - 1].tolist()),
+                                      energy_variation=energy_variations[steps - 1])
+        return steps
+
+    def record_rejected_move(self,
+                             move,  # type: tuple
+                             energy_variation,  # type: float
+                             ):
+        new_energy = self.energy + float(energy_variation)
+        if self.old_solutions:
+            new_solution = Solution(plan=None, energy=new_energy, move=move)
+            new_solution.reject()
+            self.add_solution(new_solution)
+        if self.statistics is not None:
+            self.statistics.record(energy=self.energy, accepted=False)
+        if self.history is not None:
+            self.record_history(energy=new_energy, accepted=False, move=move)
+
+    def verify_batch_energy_variation(self,
+                                      move,  # type: tuple
+                                      energy_variation,  # type: float
+                                      ):
+        move_energy_variation = self.move_energy_variation(move=move)
+        if not math.isclose(energy_variation, move_energy_variation, rel_tol=1e-6, abs_tol=1e-6):
+            raise EnergyVerificationError(
+                "batch energy variation %f doesn't match energy variation %f for move %s" %
+                (energy_variation, move_energy_variation, move))
+
+    def solution_equilibrium_achievement(self):
         new_solution = self.generate_solution(data=self.data)
         if self.solution_generator_status == SolutionGeneratorStatusType.CONTINUE:
-            new_solution.calculate_energy(solver=self)
-            energy_variation = self.comparison_of_solutions(new_energy=new_solution.energy)
+            energy_variation = self.comparison_of_solutions(new_solution=new_solution)
             if energy_variation > 0:
                 if self.metropolis_acceptance_criterion(energy_variation=energy_variation):
                     new_solution.accept()
@@ -284,21 +643,198 @@ class SMA(Solver, ABC, ObjectiveFunction, SolutionGenerator, CoolingSchedule):
                     new_solution.reject()
             else:
                 new_solution.accept()
-            self.incomplete_state.add_solution(new_solution)
+            self.add_solution(new_solution)
+            if self.statistics is not None:
+                self.statistics.record(energy=self.energy, accepted=new_solution.accepted)
+            if self.history is not None:
+                self.record_history(energy=new_solution.energy, accepted=new_solution.accepted, move=new_solution.move)
+
+    def record_history(self,
+                       energy,  # type: float
+                       accepted,  # type: bool
+                       move=None,  # type: typing.Optional[tuple]
+                       ):
+        self.history.record(temperature=self.temperature, energy=energy, accepted=accepted, move=move)
+        self.history.record_solution(temperature=self.temperature, energy=self.energy, plan=self.solution.plan)
+
+    def estimate_temperatures(self):
+        initial_temperature, temperature_min = self.temperature_estimation.estimate(solver=self)
+        if self.initial_temperature is None:
+            self.temperature = self.temperature_max = self.initial_temperature = initial_temperature
+        if self.temperature_min is None:
+            self.temperature_min = temperature_min
 
     def reduce_system_temperature(self):
         self.cool()
         self.create_and_add_new_state()
 
-    def solve(self):
-        while not self.stopping_criteria():
+    def restart(self,
+                solution,  # type: Solution
+                temperature,  # type: float
+                ):
+        """
+        continues from the given solution at the given temperature, e.g. after replicas exchanged their solutions.
+        """
+        self.temperature = temperature
+        solution.calculate_energy(solver=self)
+        solution.accept()
+        state = State(temperature=temperature, old_solutions=self.old_solutions)
+        if self.old_states:
+            self.state_list.appendleft(state)
+        else:
+            self.state_list = deque([state])
+        self.add_solution(solution=solution, state=state)
+
+    def sample(self,
+               steps,  # type: int
+               ) -> Solution:
+        """
+        runs metropolis algorithm at the current temperature without cooling, every accepted solution starts a new
+        state.
+        """
+        for _ in range(steps):
+            if not self.incomplete_state:
+                self.create_and_add_new_state()
+            self.thermal_equilibrium_achievement()
+            if self.solution_generator_status == SolutionGeneratorStatusType.STOPPED:
+                break
+        return self.solution
+
+    def budget_fraction(self) -> typing.Optional[float]:
+        """
+        used part of time_budget or evaluation_budget, whichever is larger. None without budgets.
+        """
+        fractions = []
+        if self.time_budget:
+            fractions.append((time.perf_counter() - self.start_time) / self.time_budget)
+        if self.evaluation_budget:
+            fractions.append(self.evaluations / self.evaluation_budget)
+        return max(fractions) if fractions else None
+
+    def fit_cooling_to_budget(self,
+                              budget_fraction,  # type: float
+                              ):
+        """
+        moves k to the same fraction of the coolings between initial_temperature and temperature_min, so the next
+        cooling gives the temperature of that point of the schedule. the logarithmic schedule needs about
+        exp(cooling_speed * initial_temperature / temperature_min) coolings, a fraction of them would drop the
+        temperature to the end of the schedule at once, so its k gives the temperature that is the same fraction of
+        the way from initial_temperature to temperature_min on a log scale. the next cooling is at least the first
+        one of the schedule. adaptive schedules are not stretched.
+        """
+        if self.cooling_schedule_type in ADAPTIVE_COOLING_SCHEDULES:
+            return
+        if self.cooling_schedule_type == CoolingScheduleType.LOGARITHMIC:
+            temperature_ratio = self.temperature_min / self.initial_temperature
+            temperature = self.initial_temperature * temperature_ratio ** budget_fraction
+            try:
+                k = math.expm1(self.cooling_speed * self.initial_temperature / temperature)
+            except OverflowError:
+                return
+        else:
+            k = budget_fraction * self.CoolingCountChoices[self.cooling_schedule_type.value]()
+            if not math.isfinite(k):
+                return
+        self.k = max(k, 1) - 1
+
+    def iter_solve(self) -> typing.Iterator[Progress]:
+        """
+        yields progress after each temperature, best_solution is the best solution so far. solving can be stopped
+        between temperatures by leaving the loop.
+        """
+        self.start_time = time.perf_counter()
+        deadline = self.start_time + self.time_budget if self.time_budget else None
+        if self.metrics is not None:
+            self.metrics.start(solver=self)
+        try:
+            yield from self.anneal(deadline=deadline)
+        finally:
+            if self.metrics is not None:
+                self.metrics.stop(solver=self)
+
+    def anneal(self,
+               deadline,  # type: typing.Optional[float]
+               ) -> typing.Iterator[Progress]:
+        """
+        temperatures of iter_solve, a temperature ends at its first accepted solution or after steps.
+        """
+        if self.temperature_estimation is not None and None in (self.initial_temperature, self.temperature_min):
+            self.estimate_temperatures()
+        if self.epoch_length is not None:
+            self.epoch_length.start()
+        while not self.stopping_criteria() and not self.frozen():
+            budget_fraction = self.budget_fraction()
+            if budget_fraction is not None:
+                if budget_fraction >= 1:
+                    break
+                self.fit_cooling_to_budget(budget_fraction=budget_fraction)
             self.reduce_system_temperature()
             if self.cooling_status == CoolingStatusType.STOPPED:
                 break
+            if self.metrics is not None:
+                self.metrics.start_level(solver=self)
+            if self.epoch_length is not None:
+                self.steps = self.epoch_length.steps(solver=self)
+                epoch_start_time = time.perf_counter()
+            steps = self.steps
+            if self.evaluation_budget:
+                steps = min(steps, self.evaluation_budget - self.evaluations - 1)
             step = 0
-            while step <= self.steps and self.incomplete_state:
+            batch_size = min(max(1, self.batch_steps), self.batch_size)
+            while step <= steps and self.incomplete_state:
+                if self.batch_size:
+                    step += self.thermal_equilibrium_batch(size=min(batch_size, steps + 1 - step))
+                    batch_size = min(2 * batch_size, self.batch_size)
+                    if deadline is not None and time.perf_counter() > deadline:
+                        break
+                    continue
                 self.thermal_equilibrium_achievement()
                 if self.solution_generator_status == SolutionGeneratorStatusType.STOPPED:
                     break
                 step += 1
-        return self.solution.plan
+                if deadline is not None and not step % DEADLINE_CHECK_STEPS and time.perf_counter() > deadline:
+                    break
+            self.batch_steps = step
+            self.evaluations += step
+            if self.metrics is not None:
+                self.metrics.end_level(solver=self, steps=step, accepted=not self.incomplete_state)
+            if self.epoch_length is not None:
+                self.epoch_length.update(steps=step, accepted=not self.incomplete_state,
+                                         elapsed_time=time.perf_counter() - epoch_start_time)
+            progress = Progress(k=self.k, temperature=self.temperature, energy=self.energy,
+                                best_energy=self.best.energy, evaluations=self.evaluations,
+                                elapsed_time=time.perf_counter() - self.start_time)
+            if self.callback is not None and self.callback(progress):
+                break
+            yield progress
+
+    def polish(self):
+        """
+        greedy descent from the best solution, each improving move starts a new state at the current temperature.
+        """
+        best_solution = self.best_solution
+        self.restart(solution=Solution(plan=copy.copy(best_solution.plan), energy=best_solution.energy),
+                     temperature=self.temperature)
+        self.best.reset(plan=self.solution.plan, energy=self.energy)
+        failures = 0
+        while failures < self.polish_steps:
+            move = self.generate_move(data=self.data)
+            if move is None:
+                break
+            energy_variation = self.move_energy_variation(move=move)
+            if energy_variation < 0:
+                self.create_and_add_new_state()
+                self.accept_move(move=move, energy_variation=energy_variation)
+                failures = 0
+            else:
+                failures += 1
+
+    def solve(self):
+        """
+        :return plan: plan of the best solution
+        """
+        for _ in self.iter_solve():
+            pass
+        if self.polish_steps:
+            self.polish()
+        return self.best_solution.plan
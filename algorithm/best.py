@@ -0,0 +1,71 @@
+import copy
+import typing
+
+
+class BestSolution:
+    """
+    best solution of a run. accepted moves after the best plan are kept in a journal, a new best only marks the
+    journal length and the plan is brought up to the mark by applying the moves when the journal is full or the plan
+    is read. when no best is found for limit moves the journal is dropped and the next best copies the current plan.
+    """
+
+    def __init__(self,
+                 limit=None,  # type: typing.Optional[int]
+                 ):
+        """
+        :param limit: number of moves in the journal, length of the plan if not given
+        """
+        self.limit = limit
+        self.plan = None  # type: typing.Optional[list]
+        self.energy = None  # type: typing.Optional[float]
+        self.journal = []  # type: typing.Optional[typing.List[tuple]]
+        self.mark = 0  # type: int
+
+    def clear(self):
+        self.plan, self.energy, self.journal, self.mark = None, None, [], 0
+
+    def reset(self,
+              plan,  # type: list
+              energy,  # type: float
+              ):
+        self.plan, self.energy, self.journal, self.mark = copy.copy(plan), energy, [], 0
+
+    def record(self,
+               solver,  # type: typing.Any
+               solution,  # type: typing.Any
+               ):
+        """
+        called with each accepted solution, solution.move leads from the previous accepted solution to solution.
+        """
+        improved = self.energy is None or solution.energy < self.energy
+        if solution.move is None or self.journal is None:
+            if improved:
+                self.reset(plan=solution.plan, energy=solution.energy)
+            elif solution.move is None:
+                self.journal = None
+            return
+        self.journal.append(solution.move)
+        if improved:
+            self.energy, self.mark = solution.energy, len(self.journal)
+        if len(self.journal) > (self.limit or len(self.plan)):
+            self.synchronize(solver=solver)
+            if len(self.journal) > (self.limit or len(self.plan)):
+                self.journal = None
+
+    def synchronize(self,
+                    solver,  # type: typing.Any
+                    ):
+        """
+        applies the journal up to the mark to the plan.
+        """
+        for move in self.journal[:self.mark]:
+            solver.apply_move(self.plan, move)
+        del self.journal[:self.mark]
+        self.mark = 0
+
+    def best_plan(self,
+                  solver,  # type: typing.Any
+                  ) -> list:
+        if self.journal:
+            self.synchronize(solver=solver)
+        return self.plan
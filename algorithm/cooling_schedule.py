@@ -1,14 +1,22 @@
 import math
-from collections import OrderedDict
+from collections import OrderedDict, deque
 from enum import Enum
 from functools import cached_property
-from typing import Union
+from typing import Optional, Union
+
+from algorithm.statistics import AcceptanceStatistics
 
 
 class CoolingScheduleType(Enum):
     LOGARITHMIC = 1  # T(k) = α*To / ln (1 + k)
     GEOMETRIC = 2  # T(k) = α^k * To
     EXPONENTIAL = 3  # T(k) = To*exp(−α*k^(1/N))
+    HUANG = 4  # T(k+1) = T(k)*exp(−α*T(k)/σ), σ is standard deviation of energy
+    LAM_DELOSME = 5  # 1/T(k+1) = 1/T(k) + α/σ * T(k)^2/σ^2 * 4ρ(1−ρ)^2/(2−ρ)^2, ρ is acceptance ratio
+
+
+# schedules that read acceptance statistics
+ADAPTIVE_COOLING_SCHEDULES = {CoolingScheduleType.HUANG, CoolingScheduleType.LAM_DELOSME}
 
 
 class CoolingStatusType(Enum):
@@ -27,18 +35,39 @@ class CoolingSchedule:
                  k=0,  # type: float
                  n=1,  # type: float
                  cooling_schedule_type=CoolingScheduleType.GEOMETRIC,  # type: Union[int, None, CoolingScheduleType]
+                 statistics_window=1000,  # type: int
+                 reheat_acceptance_ratio=None,  # type: Optional[float]
+                 reheat_coolings=10,  # type: int
+                 max_reheats=1,  # type: int
+                 frozen_acceptance_ratio=None,  # type: Optional[float]
                  ):
         """
         :param temperature: temperature is the current temperature
         :param cooling_speed: cooling_speed is the cooling speed parameter.
         :param k: k is the iteration
         :param n: N is the dimensionality of the model space
+        :param statistics_window: number of steps in acceptance statistics, adaptive schedules keep the initial
+        temperature until the window is full.
+        :param reheat_acceptance_ratio: when acceptance ratio falls below it, temperature goes back reheat_coolings
+        coolings, at most max_reheats times.
+        :param frozen_acceptance_ratio: solving stops when acceptance ratio falls below it and no reheat is left.
         """
         self.CoolingScheduleChoices = OrderedDict(
             [
                 (CoolingScheduleType.LOGARITHMIC.value, self.logarithmic),
                 (CoolingScheduleType.GEOMETRIC.value, self.geometric),
                 (CoolingScheduleType.EXPONENTIAL.value, self.exponential),
+                (CoolingScheduleType.HUANG.value, self.huang),
+                (CoolingScheduleType.LAM_DELOSME.value, self.lam_delosme),
+            ]
+        )
+        self.CoolingCountChoices = OrderedDict(
+            [
+                (CoolingScheduleType.LOGARITHMIC.value, self.logarithmic_cooling_count),
+                (CoolingScheduleType.GEOMETRIC.value, self.geometric_cooling_count),
+                (CoolingScheduleType.EXPONENTIAL.value, self.exponential_cooling_count),
+                (CoolingScheduleType.HUANG.value, self.adaptive_cooling_count),
+                (CoolingScheduleType.LAM_DELOSME.value, self.adaptive_cooling_count),
             ]
         )
         self.temperature = temperature
@@ -47,7 +76,17 @@ class CoolingSchedule:
         self.cooling_speed = cooling_speed
         self.k = k
         self.n = n
-        self.cooling_schedule_type = cooling_schedule_type
+        self.cooling_schedule_type = CoolingScheduleType(cooling_schedule_type or CoolingScheduleType.GEOMETRIC)
+        self.previous_temperature = temperature
+        self.reheat_acceptance_ratio = reheat_acceptance_ratio
+        self.reheat_temperatures = deque(maxlen=reheat_coolings)  # type: deque
+        self.reheats = 0  # type: int
+        self.max_reheats = max_reheats if reheat_acceptance_ratio else 0
+        self.frozen_acceptance_ratio = frozen_acceptance_ratio
+        self.statistics = None  # type: Optional[AcceptanceStatistics]
+        if self.cooling_schedule_type in ADAPTIVE_COOLING_SCHEDULES or reheat_acceptance_ratio or \
+                frozen_acceptance_ratio:
+            self.statistics = AcceptanceStatistics(window=statistics_window)
         super(CoolingSchedule, self).__init__()
 
     @cached_property
@@ -55,10 +94,15 @@ class CoolingSchedule:
         return self.temperature
 
     def cool(self) -> bool:
-        self.k += 1
-        new_temperature = self.CoolingScheduleChoices[self.cooling_schedule_type.value]()
+        if self.reheat_required():
+            new_temperature = self.reheat()
+        else:
+            if self.max_reheats:
+                self.reheat_temperatures.append((self.k, self.temperature))
+            self.k += 1
+            new_temperature = self.CoolingScheduleChoices[self.cooling_schedule_type.value]()
         if new_temperature >= self.temperature_min:
-            self.temperature = new_temperature
+            self.previous_temperature, self.temperature = self.temperature, new_temperature
             self.cooling_status = CoolingStatusType.CONTINUE
             return True
         else:
@@ -80,3 +124,74 @@ class CoolingSchedule:
     def exponential(self):
         temperature = self.initial_temperature * math.exp(-self.cooling_speed * (self.k ** (1 / self.n)))
         return temperature
+
+    def huang(self):
+        """
+        temperature decreases at most by half in each cooling, as suggested by Huang et al.
+        """
+        if not self.statistics.full:
+            return self.temperature
+        if not self.statistics.energy_deviation:
+            return 0.0
+        return self.temperature * max(0.5, math.exp(-self.cooling_speed * self.temperature /
+                                                    self.statistics.energy_deviation))
+
+    def lam_delosme(self):
+        if not self.statistics.full:
+            return self.temperature
+        deviation, acceptance_ratio = self.statistics.energy_deviation, self.statistics.acceptance_ratio
+        if not deviation:
+            return 0.0
+        inverse_temperature = 1 / self.temperature + self.cooling_speed / deviation * \
+            self.temperature ** 2 / deviation ** 2 * \
+            4 * acceptance_ratio * (1 - acceptance_ratio) ** 2 / (2 - acceptance_ratio) ** 2
+        return 1 / inverse_temperature
+
+    def reheat_required(self) -> bool:
+        return self.reheats < self.max_reheats and bool(self.reheat_temperatures) and self.statistics.full and \
+            self.statistics.acceptance_ratio < self.reheat_acceptance_ratio
+
+    def reheat(self) -> float:
+        """
+        goes back to the temperature of reheat_coolings coolings ago, statistics start again.
+        """
+        self.reheats += 1
+        self.k, temperature = self.reheat_temperatures[0]
+        self.reheat_temperatures.clear()
+        self.statistics.reset()
+        return temperature
+
+    def frozen(self) -> bool:
+        return self.frozen_acceptance_ratio is not None and self.reheats >= self.max_reheats and \
+            self.statistics.full and self.statistics.acceptance_ratio < self.frozen_acceptance_ratio
+
+    def remaining_coolings(self) -> float:
+        """
+        closed form number of coolings until temperature is below temperature_min, inf if it never is.
+        """
+        return max(0.0, self.CoolingCountChoices[self.cooling_schedule_type.value]() - self.k)
+
+    def logarithmic_cooling_count(self) -> float:
+        try:
+            return math.exp(self.cooling_speed * self.initial_temperature / self.temperature_min) - 1
+        except OverflowError:
+            return math.inf
+
+    def geometric_cooling_count(self) -> float:
+        if not 0 < self.cooling_speed < 1:
+            return math.inf
+        return math.log(self.temperature_min / self.initial_temperature) / math.log(self.cooling_speed)
+
+    def adaptive_cooling_count(self) -> float:
+        """
+        assumes that temperature keeps decreasing with the ratio of the last cooling.
+        """
+        cooling_ratio = self.temperature / self.previous_temperature
+        if not 0 < cooling_ratio < 1:
+            return math.inf
+        return self.k + math.log(self.temperature_min / self.temperature) / math.log(cooling_ratio)
+
+    def exponential_cooling_count(self) -> float:
+        if self.cooling_speed <= 0:
+            return math.inf
+        return (math.log(self.initial_temperature / self.temperature_min) / self.cooling_speed) ** self.n
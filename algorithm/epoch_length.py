@@ -0,0 +1,110 @@
+import math
+import time
+import typing
+from collections import OrderedDict
+from enum import Enum
+
+
+class EpochLengthType(Enum):
+    NEIGHBOURHOOD = 1  # L = n(n-1)
+    LINEAR = 2  # L = size_factor * n
+    ADAPTIVE = 3  # L = margin / acceptance rate
+    TIME_BUDGET = 4  # L = remaining time / remaining temperatures / time of a step, an upper bound only
+
+
+class EpochLength:
+    """
+    steps of each temperature, n is the number of locations. steps are an upper bound, a temperature ends with its
+    first accepted solution.
+    """
+
+    def __init__(self,
+                 epoch_length_type=EpochLengthType.LINEAR,  # type: EpochLengthType
+                 size_factor=100,  # type: float
+                 minimum_steps=1,  # type: int
+                 maximum_steps=None,  # type: typing.Optional[int]
+                 margin=3.0,  # type: float
+                 smoothing=0.1,  # type: float
+                 time_budget=None,  # type: typing.Optional[float]
+                 ):
+        """
+        :param size_factor: steps per location of linear epochs, also the length of the first adaptive and time
+        budget epochs.
+        :param maximum_steps: n(n-1) if not given
+        :param margin: expected number of acceptances of an adaptive epoch
+        :param smoothing: weight of the last epoch in the moving averages of acceptance rate and step time
+        :param time_budget: seconds of a time budget run. a temperature ends with its first accepted solution, so
+        the steps only limit runs of rejected moves and a run usually ends long before the budget, SMA time_budget
+        stretches the cooling schedule to the budget instead.
+        """
+        self.EpochLengthChoices = OrderedDict(
+            [
+                (EpochLengthType.NEIGHBOURHOOD.value, self.neighbourhood),
+                (EpochLengthType.LINEAR.value, self.linear),
+                (EpochLengthType.ADAPTIVE.value, self.adaptive),
+                (EpochLengthType.TIME_BUDGET.value, self.time_budget_steps),
+            ]
+        )
+        if epoch_length_type == EpochLengthType.TIME_BUDGET and not time_budget:
+            raise ValueError("time budget epochs require time_budget")
+        self.epoch_length_type = epoch_length_type
+        self.size_factor = size_factor
+        self.minimum_steps = minimum_steps
+        self.maximum_steps = maximum_steps
+        self.margin = margin
+        self.smoothing = smoothing
+        self.time_budget = time_budget
+        self.acceptance_rate = None  # type: typing.Optional[float]
+        self.step_time = None  # type: typing.Optional[float]
+        self.start_time = None  # type: typing.Optional[float]
+
+    def start(self):
+        """
+        called when solve starts, statistics of previous runs are cleared.
+        """
+        self.acceptance_rate, self.step_time, self.start_time = None, None, time.perf_counter()
+
+    def steps(self, solver) -> int:
+        size = len(solver.data)
+        maximum_steps = self.maximum_steps or size * (size - 1)
+        steps = self.EpochLengthChoices[self.epoch_length_type.value](solver=solver, size=size)
+        return int(min(max(steps, self.minimum_steps), maximum_steps))
+
+    def update(self,
+               steps,  # type: int
+               accepted,  # type: bool
+               elapsed_time,  # type: float
+               ):
+        """
+        called after each temperature with the number of steps it took.
+        """
+        if not steps:
+            return
+        acceptance_rate, step_time = int(accepted) / steps, elapsed_time / steps
+        if self.acceptance_rate is None:
+            self.acceptance_rate, self.step_time = acceptance_rate, step_time
+        else:
+            self.acceptance_rate += self.smoothing * (acceptance_rate - self.acceptance_rate)
+            self.step_time += self.smoothing * (step_time - self.step_time)
+
+    @staticmethod
+    def neighbourhood(size, **kwargs) -> float:
+        return size * (size - 1)
+
+    def linear(self, size, **kwargs) -> float:
+        return self.size_factor * size
+
+    def adaptive(self, size, **kwargs) -> float:
+        if not self.acceptance_rate:
+            return self.linear(size=size) if self.acceptance_rate is None else math.inf
+        return self.margin / self.acceptance_rate
+
+    def time_budget_steps(self, solver, size) -> float:
+        """
+        steps that spend the remaining time evenly on the remaining temperatures if no step is accepted. it doesn't
+        make the run time predictable, see SMA time_budget for that.
+        """
+        if self.step_time is None:
+            return self.linear(size=size)
+        remaining_time = self.time_budget - (time.perf_counter() - self.start_time)
+        return remaining_time / max(1.0, solver.remaining_coolings()) / max(self.step_time, 1e-9)
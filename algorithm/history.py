@@ -0,0 +1,100 @@
+import typing
+from array import array
+from collections import deque
+
+
+class Snapshot(typing.NamedTuple):
+    step: int
+    temperature: float
+    energy: float
+    plan: list
+
+
+class History:
+    """
+    records temperature, candidate energy, acceptance and move of each step in preallocated ring buffers, only the
+    last capacity steps are kept. plans are kept only as snapshots, every snapshot_interval steps and optionally for
+    each new best solution.
+    """
+
+    def __init__(self,
+                 capacity=2 ** 16,  # type: int
+                 move_size=4,  # type: int
+                 snapshot_interval=0,  # type: int
+                 snapshot_capacity=16,  # type: int
+                 snapshot_best=False,  # type: bool
+                 ):
+        """
+        :param capacity: number of steps that are kept
+        :param move_size: number of integers of a move, shorter moves are padded with -1
+        :param snapshot_interval: plan of the current solution is copied every snapshot_interval steps, 0 disables
+        :param snapshot_capacity: number of periodic snapshots that are kept
+        :param snapshot_best: copies plan of each solution that is better than all previous ones
+        """
+        self.capacity = capacity
+        self.move_size = move_size
+        self.temperature = array("d", [0.0]) * capacity
+        self.energy = array("d", [0.0]) * capacity
+        self.accepted = array("b", [0]) * capacity
+        self.move = array("q", [-1]) * (capacity * move_size)
+        self.step = 0  # type: int
+        self.snapshot_interval = snapshot_interval
+        self.snapshots = deque(maxlen=snapshot_capacity)  # type: typing.Deque[Snapshot]
+        self.snapshot_best = snapshot_best
+        self.best = None  # type: typing.Optional[Snapshot]
+
+    def __len__(self):
+        return min(self.step, self.capacity)
+
+    def record(self,
+               temperature,  # type: float
+               energy,  # type: float
+               accepted,  # type: bool
+               move=None,  # type: typing.Optional[tuple]
+               ):
+        index = self.step % self.capacity
+        self.temperature[index] = temperature
+        self.energy[index] = energy
+        self.accepted[index] = accepted
+        move_index = index * self.move_size
+        if move is None:
+            self.move[move_index:move_index + self.move_size] = array("q", [-1]) * self.move_size
+        else:
+            for offset in range(self.move_size):
+                self.move[move_index + offset] = move[offset] if offset < len(move) else -1
+        self.step += 1
+
+    def record_solution(self,
+                        temperature,  # type: float
+                        energy,  # type: float
+                        plan,
+                        ):
+        """
+        called with the current solution after each step, copies its plan when a snapshot is due.
+        """
+        if self.snapshot_interval and self.step % self.snapshot_interval == 0:
+            self.snapshots.append(Snapshot(step=self.step, temperature=temperature, energy=energy, plan=list(plan)))
+        if self.snapshot_best and (self.best is None or energy < self.best.energy):
+            self.best = Snapshot(step=self.step, temperature=temperature, energy=energy, plan=list(plan))
+
+    def chronological(self, column) -> array:
+        """
+        :param column: one of the ring buffers
+        :return column: recorded values from oldest to newest
+        """
+        width = len(column) // self.capacity
+        if self.step <= self.capacity:
+            return column[:self.step * width]
+        index = (self.step % self.capacity) * width
+        return column[index:] + column[:index]
+
+    def columns(self) -> typing.Dict[str, array]:
+        """
+        moves are flattened, each move is move_size integers.
+        """
+        return dict(
+            temperature=self.chronological(self.temperature),
+            energy=self.chronological(self.energy),
+            accepted=self.chronological(self.accepted),
+            move=self.chronological(self.move),
+        )
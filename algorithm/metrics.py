@@ -0,0 +1,204 @@
+"""
+counters and timers of each temperature and of the whole solve. the solver checks metrics once per temperature, calls
+of objective_function, objective_function_variation and objective_function_variations are counted by wrappers that
+are set on the solver only while a solve with metrics runs, so a solver without metrics runs unchanged code.
+"""
+import collections
+import json
+import os
+import sys
+import threading
+import time
+import typing
+
+COUNTED_METHODS = ("objective_function", "objective_function_variation", "objective_function_variations")
+# counters whose sum is the number of evaluated solutions, batch_moves counts moves of objective_function_variations
+EVALUATION_COUNTERS = ("objective_function", "objective_function_variation", "batch_moves")
+
+
+class JsonLinesSink:
+    """
+    writes each record as a json line, the file is flushed after each solve.
+    """
+
+    def __init__(self,
+                 path,  # type: typing.Union[str, os.PathLike]
+                 ):
+        self.path = path
+        self.file = open(path, "a")
+
+    def __call__(self,
+                 record,  # type: typing.Dict[str, typing.Any]
+                 ):
+        self.file.write(json.dumps(record) + "\n")
+        if record["event"] == "solve":
+            self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class SamplingProfiler:
+    """
+    samples the stack of the solving thread from a daemon thread every interval seconds, the sampled thread isn't
+    traced so it runs at full speed between samples.
+    """
+
+    def __init__(self,
+                 interval=0.005,  # type: float
+                 depth=32,  # type: int
+                 ):
+        """
+        :param depth: number of innermost frames of a sample
+        """
+        self.interval = interval
+        self.depth = depth
+        self.samples = collections.Counter()  # type: typing.Counter[str]
+        self.thread = None  # type: typing.Optional[threading.Thread]
+        self.stopped = threading.Event()
+
+    def start(self):
+        self.samples.clear()
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.sample, args=(threading.get_ident(),), daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def sample(self,
+               thread_id,  # type: int
+               ):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(thread_id)
+            stack = []
+            while frame is not None and len(stack) < self.depth:
+                stack.append("%s:%s" % (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name))
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def top(self,
+            count=20,  # type: int
+            ) -> typing.List[typing.Tuple[str, int]]:
+        """
+        :return stacks: most sampled stacks in collapsed format, outermost frame first
+        """
+        return self.samples.most_common(count)
+
+
+class Metrics:
+    """
+    a "level" record is sent to the sinks after each temperature and a "solve" record with the totals when solve
+    ends. records are dicts, proposals of a temperature are accepted, uphill_accepted or rejected. evaluations are
+    full and delta energy evaluations, each move of a batch is an evaluation.
+    """
+
+    def __init__(self,
+                 sinks=(),  # type: typing.Sequence[typing.Callable[[typing.Dict[str, typing.Any]], typing.Any]]
+                 levels=True,  # type: bool
+                 profiler=None,  # type: typing.Optional[SamplingProfiler]
+                 profile_stacks=20,  # type: int
+                 ):
+        """
+        :param sinks: functions that are called with each record, e.g. JsonLinesSink or list.append
+        :param levels: sends a record for each temperature, only the solve record is sent otherwise
+        :param profiler: runs during solve, its most sampled stacks are added to the solve record
+        :param profile_stacks: number of stacks in the solve record
+        """
+        self.sinks = list(sinks)
+        self.levels = levels
+        self.profiler = profiler
+        self.profile_stacks = profile_stacks
+        self.calls = collections.Counter()  # type: typing.Counter[str]
+        self.totals = collections.Counter()  # type: typing.Counter[str]
+        self.start_time = None  # type: typing.Optional[float]
+        self.level_start_time = None  # type: typing.Optional[float]
+        self.level_energy = None  # type: typing.Optional[float]
+        self.level_calls = collections.Counter()  # type: typing.Counter[str]
+
+    def emit(self,
+             record,  # type: typing.Dict[str, typing.Any]
+             ):
+        for sink in self.sinks:
+            sink(record)
+
+    def counted(self,
+                name,  # type: str
+                method,  # type: typing.Callable
+                ) -> typing.Callable:
+        calls = self.calls
+        if name == "objective_function_variations":
+            def counted_batch(moves, *args, **kwargs):
+                calls[name] += 1
+                calls["batch_moves"] += len(moves)
+                return method(moves, *args, **kwargs)
+            return counted_batch
+
+        def counted_method(*args, **kwargs):
+            calls[name] += 1
+            return method(*args, **kwargs)
+        return counted_method
+
+    def start(self,
+              solver,  # type: typing.Any
+              ):
+        """
+        sets counting wrappers on solver and starts the profiler.
+        """
+        self.calls.clear()
+        self.totals.clear()
+        for name in COUNTED_METHODS:
+            setattr(solver, name, self.counted(name, getattr(solver, name)))
+        if self.profiler is not None:
+            self.profiler.start()
+        self.start_time = time.perf_counter()
+
+    def start_level(self,
+                    solver,  # type: typing.Any
+                    ):
+        self.level_start_time, self.level_energy = time.perf_counter(), solver.energy
+        self.level_calls = collections.Counter(self.calls)
+
+    def end_level(self,
+                  solver,  # type: typing.Any
+                  steps,  # type: int
+                  accepted,  # type: bool
+                  ):
+        """
+        :param steps: proposals of the temperature, a temperature ends with its first accepted proposal
+        """
+        uphill = accepted and solver.energy > self.level_energy
+        calls = self.calls - self.level_calls
+        counters = dict(proposals=steps, accepted=int(accepted and not uphill), uphill_accepted=int(uphill),
+                        rejected=steps - int(accepted), evaluations=sum(calls[name] for name in EVALUATION_COUNTERS),
+                        **{name: calls[name] for name in COUNTED_METHODS})
+        self.totals.update(counters)
+        self.totals["levels"] += 1
+        if self.levels:
+            self.emit(dict(event="level", k=solver.k, temperature=solver.temperature, energy=solver.energy,
+                           best_energy=solver.best.energy,
+                           elapsed_time=time.perf_counter() - self.level_start_time, **counters))
+
+    def stop(self,
+             solver,  # type: typing.Any
+             ):
+        """
+        removes the wrappers and sends the solve record.
+        """
+        elapsed_time = time.perf_counter() - self.start_time
+        if self.profiler is not None:
+            self.profiler.stop()
+        for name in COUNTED_METHODS:
+            solver.__dict__.pop(name, None)
+        totals = dict(self.totals, evaluations=sum(self.calls[name] for name in EVALUATION_COUNTERS),
+                      **{name: self.calls[name] for name in COUNTED_METHODS})
+        record = dict(event="solve", elapsed_time=elapsed_time, energy=solver.energy, best_energy=solver.best.energy,
+                      proposals_per_second=totals.get("proposals", 0) / elapsed_time if elapsed_time else None,
+                      **totals)
+        if self.profiler is not None:
+            record.update(profile=self.profiler.top(self.profile_stacks))
+        self.emit(record)
@@ -1,5 +1,115 @@
 """
-TODO: Computing initial temperature
+Computing initial temperature
 Kirkpatrick suggestion: "T0 = max(∆E)" from Optimization by simulated annealing
 
-"""
\ No newline at end of file
+energy variations of random moves from the initial solution are sampled, initial temperature and minimum
+temperature are derived from the uphill (∆E > 0) variations.
+"""
+import math
+import random
+import typing
+from collections import OrderedDict
+from enum import Enum
+
+
+class TemperatureEstimationType(Enum):
+    MAX_VARIATION = 1  # T0 = max(∆E), Tmin = min(∆E)
+    ACCEPTANCE_RATIO = 2  # mean(exp(-∆E/T)) = initial or final acceptance ratio
+
+
+def acceptance_ratio(
+        energy_variations,  # type: typing.List[float]
+        temperature,  # type: float
+) -> float:
+    """
+    mean metropolis acceptance probability of uphill energy variations.
+    """
+    return sum(math.exp(-energy_variation / temperature) for energy_variation in energy_variations) / \
+        len(energy_variations)
+
+
+def acceptance_ratio_temperature(
+        energy_variations,  # type: typing.List[float]
+        ratio,  # type: float
+        tolerance=1e-6,  # type: float
+) -> float:
+    """
+    bisection on temperature, acceptance ratio increases with temperature.
+    """
+    if not 0 < ratio < 1:
+        raise ValueError("acceptance ratio must be between 0 and 1")
+    low, high = 0.0, max(energy_variations)
+    while acceptance_ratio(energy_variations, high) < ratio:
+        low, high = high, high * 2
+    while high - low > tolerance * high:
+        middle = (low + high) / 2
+        if acceptance_ratio(energy_variations, middle) < ratio:
+            low = middle
+        else:
+            high = middle
+    return high
+
+
+class TemperatureEstimation:
+
+    def __init__(self,
+                 estimation_type=TemperatureEstimationType.ACCEPTANCE_RATIO,  # type: TemperatureEstimationType
+                 samples=1000,  # type: int
+                 initial_acceptance_ratio=0.8,  # type: float
+                 final_acceptance_ratio=0.001,  # type: float
+                 seed=0,  # type: typing.Optional[int]
+                 ):
+        """
+        :param samples: number of random moves from the initial solution
+        :param initial_acceptance_ratio: acceptance ratio of uphill moves at initial temperature
+        :param final_acceptance_ratio: acceptance ratio of uphill moves at minimum temperature
+        :param seed: seed of the sampled moves, they are drawn from their own generator so the random generators and
+        the move generator of the solver are left as they are
+        """
+        self.TemperatureEstimationChoices = OrderedDict(
+            [
+                (TemperatureEstimationType.MAX_VARIATION.value, self.max_variation),
+                (TemperatureEstimationType.ACCEPTANCE_RATIO.value, self.acceptance_ratio_temperatures),
+            ]
+        )
+        self.estimation_type = estimation_type
+        self.samples = samples
+        self.initial_acceptance_ratio = initial_acceptance_ratio
+        self.final_acceptance_ratio = final_acceptance_ratio
+        self.seed = seed
+
+    def energy_variations(self, solver) -> typing.List[float]:
+        """
+        uphill energy variations of moves from the current solution of solver, moves are not applied. solvers that
+        can't sample moves generate the moves or solutions of their run.
+        """
+        energy_variations = []
+        random_generator = random.Random(self.seed)
+        for _ in range(self.samples):
+            move = solver.sample_move(random_generator=random_generator)
+            if move is None:
+                move = solver.generate_move(data=solver.data)
+            if move is None:
+                new_solution = solver.generate_solution(data=solver.data)
+                energy_variation = solver.comparison_of_solutions(new_solution=new_solution)
+            else:
+                energy_variation = solver.move_energy_variation(move=move)
+            if energy_variation > 0:
+                energy_variations.append(energy_variation)
+        if not energy_variations:
+            raise ValueError("no uphill move in %d samples, temperatures can't be estimated" % self.samples)
+        return energy_variations
+
+    def estimate(self, solver) -> typing.Tuple[float, float]:
+        """
+        :return temperatures: initial temperature and minimum temperature
+        """
+        return self.TemperatureEstimationChoices[self.estimation_type.value](self.energy_variations(solver=solver))
+
+    @staticmethod
+    def max_variation(energy_variations) -> typing.Tuple[float, float]:
+        return max(energy_variations), min(energy_variations)
+
+    def acceptance_ratio_temperatures(self, energy_variations) -> typing.Tuple[float, float]:
+        return acceptance_ratio_temperature(energy_variations, self.initial_acceptance_ratio), \
+            acceptance_ratio_temperature(energy_variations, self.final_acceptance_ratio)
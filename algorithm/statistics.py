@@ -0,0 +1,39 @@
+import math
+
+
+class AcceptanceStatistics:
+    """
+    moving averages of acceptance and current energy over about window steps, updated in O(1) for each step. the
+    first window steps are averaged with equal weights.
+    """
+
+    def __init__(self,
+                 window=1000,  # type: int
+                 ):
+        self.window = window
+        self.steps = 0  # type: int
+        self.acceptance_ratio = 0.0  # type: float
+        self.energy_mean = 0.0  # type: float
+        self.energy_variance = 0.0  # type: float
+
+    def reset(self):
+        self.steps, self.acceptance_ratio, self.energy_mean, self.energy_variance = 0, 0.0, 0.0, 0.0
+
+    @property
+    def full(self) -> bool:
+        return self.steps >= self.window
+
+    @property
+    def energy_deviation(self) -> float:
+        return math.sqrt(self.energy_variance)
+
+    def record(self,
+               energy,  # type: float
+               accepted,  # type: bool
+               ):
+        self.steps += 1
+        weight = 1 / min(self.steps, self.window)
+        self.acceptance_ratio += weight * (accepted - self.acceptance_ratio)
+        energy_variation = energy - self.energy_mean
+        self.energy_mean += weight * energy_variation
+        self.energy_variance = (1 - weight) * (self.energy_variance + weight * energy_variation ** 2)
@@ -0,0 +1,105 @@
+import os
+import typing
+from array import array
+
+import numpy as np
+
+
+class Trace:
+    """
+    records temperature, energy and move of each accepted solution of a run in growing arrays. plans are copied only
+    as keyframes, every keyframe_interval accepted solutions and for each solution without a move, a plan of the run
+    is rebuilt by applying the moves after the keyframe before it. the trace can be saved and rendered after the run,
+    see tests/render.py.
+    """
+
+    def __init__(self,
+                 keyframe_interval=1024,  # type: int
+                 move_size=4,  # type: int
+                 ):
+        """
+        :param keyframe_interval: number of accepted solutions between keyframes
+        :param move_size: number of integers of a move, shorter moves are padded with -1
+        """
+        self.keyframe_interval = keyframe_interval
+        self.move_size = move_size
+        self.temperature = array("d")
+        self.energy = array("d")
+        self.move = array("q")
+        self.keyframe_index = array("q")
+        self.keyframes = []  # type: typing.List[np.ndarray]
+        self.arrays = {}  # type: typing.Dict[str, np.ndarray]
+
+    def __len__(self):
+        return len(self.temperature)
+
+    def clear(self):
+        self.temperature, self.energy, self.move, self.keyframe_index = array("d"), array("d"), array("q"), array("q")
+        self.keyframes = []
+
+    def record(self,
+               solver,  # type: typing.Any
+               solution,  # type: typing.Any
+               ):
+        """
+        called with each accepted solution, solution.move leads from the previous accepted solution to solution.
+        """
+        index = len(self)
+        self.temperature.append(solver.temperature)
+        self.energy.append(solution.energy)
+        if solution.move is None:
+            self.move.extend([-1] * self.move_size)
+        else:
+            self.move.extend(solution.move)
+            if len(solution.move) < self.move_size:
+                self.move.extend([-1] * (self.move_size - len(solution.move)))
+        if solution.move is None or not self.keyframe_index or \
+                index - self.keyframe_index[-1] >= self.keyframe_interval:
+            self.keyframe_index.append(index)
+            self.keyframes.append(np.array(solution.plan))
+
+    def plan(self,
+             index,  # type: int
+             apply_move,  # type: typing.Callable[[np.ndarray, tuple], typing.Any]
+             ) -> np.ndarray:
+        """
+        :param index: index of an accepted solution
+        :param apply_move: applies a move to a plan array in place, e.g. apply_move of the solver
+        :return plan: plan of the accepted solution at index
+        """
+        keyframe = int(np.searchsorted(self.keyframe_index, index, side="right")) - 1
+        plan = np.array(self.keyframes[keyframe])
+        moves = np.asarray(self.move).reshape(-1, self.move_size)
+        for move in moves[self.keyframe_index[keyframe] + 1:index + 1].tolist():
+            apply_move(plan, tuple(move))
+        return plan
+
+    def save(self,
+             path,  # type: typing.Union[str, os.PathLike]
+             **arrays
+             ):
+        """
+        :param arrays: saved with the trace, e.g. coordinates of the locations
+        """
+        np.savez_compressed(
+            path, temperature=np.asarray(self.temperature), energy=np.asarray(self.energy),
+            move=np.asarray(self.move).reshape(-1, self.move_size), keyframe_index=np.asarray(self.keyframe_index),
+            keyframes=np.stack(self.keyframes), keyframe_interval=self.keyframe_interval, **arrays)
+
+    @classmethod
+    def load(cls,
+             path,  # type: typing.Union[str, os.PathLike]
+             ) -> "Trace":
+        """
+        arrays that were saved with the trace are kept in the arrays attribute.
+        """
+        with np.load(path) as saved:
+            arrays = dict(saved)
+        trace = cls(keyframe_interval=int(arrays.pop("keyframe_interval")), move_size=arrays["move"].shape[1])
+        trace.temperature = array("d", arrays.pop("temperature").tobytes())
+        trace.energy = array("d", arrays.pop("energy").tobytes())
+        trace.move = array("q", arrays.pop("move").astype(np.int64).tobytes())
+        trace.keyframe_index = array("q", arrays.pop("keyframe_index").astype(np.int64).tobytes())
+        trace.keyframes = list(arrays.pop("keyframes"))
+        trace.arrays = arrays
+        return trace
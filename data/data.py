@@ -1,28 +1,12 @@
 import pathlib
-import csv
 
+from data import loader
 
-def get_data(txt_file="wg22_xy.txt"):
-    def isfloat(value):
-        try:
-            float(value)
-            return True
-        except ValueError:
-            return False
 
-    base_dir = pathlib.Path(__file__).parent.parent.absolute()
-    data = {}
-    location_key = 0
-    with open(base_dir.joinpath("data").joinpath(txt_file), 'r') as xy_file:
-        reader = csv.reader(xy_file, delimiter=' ')
-        for row in reader:
-            if "#" in row:
-                continue
-            coord = tuple(float(i) for i in row if isfloat(i) and -90 < float(i) < 90 and float(i) != 0)
-            if len(coord) != 2:
-                continue
-            data.update(
-                {location_key: coord}
-            )
-            location_key += 1
-    return data
+def get_data(txt_file="wg22_xy.txt"):
+    """
+    coordinates of a file in data/files by row index, see loader for numpy arrays and other formats.
+    """
+    base_dir = pathlib.Path(__file__).parent.absolute()
+    instance = loader.load_csv(base_dir.joinpath("files").joinpath(txt_file))
+    return dict(enumerate(map(tuple, instance.coordinates.tolist())))
@@ -0,0 +1,207 @@
+"""
+instances are read straight into numpy arrays: numbers of TSPLIB sections are converted with a single numpy call
+instead of row by row, csv rows are read with the csv module, raw binary files are memory mapped.
+
+TSPLIB format: http://comopt.ifi.uni-heidelberg.de/software/TSPLIB95/tsp95.pdf
+"""
+import csv
+import os
+import pathlib
+import re
+import typing
+from array import array
+from collections import OrderedDict
+
+import numpy as np
+
+from solvers.distance import DistanceCalculatorType
+
+TSPLIB_SECTIONS = ("NODE_COORD_SECTION", "DEPOT_SECTION", "DEMAND_SECTION", "EDGE_DATA_SECTION",
+                   "FIXED_EDGES_SECTION", "DISPLAY_DATA_SECTION", "TOUR_SECTION", "EDGE_WEIGHT_SECTION", "EOF")
+# a section keyword is a line of its own, keywords in header values like COMMENT aren't sections
+TSPLIB_SECTION_PATTERN = re.compile(r"^[ \t]*(%s)[ \t]*:?[ \t]*$" % "|".join(TSPLIB_SECTIONS), re.MULTILINE)
+TSPLIB_EDGE_WEIGHT_TYPES = {
+    "EUC_2D": DistanceCalculatorType.EUC_2D,
+    "ATT": DistanceCalculatorType.ATT,
+    "GEO": DistanceCalculatorType.GEO,
+}
+# indexes of the values of each explicit format, column formats of a symmetric matrix are the mirrored row formats
+TSPLIB_EDGE_WEIGHT_FORMATS = {
+    "UPPER_ROW": lambda size: np.triu_indices(size, 1),
+    "LOWER_ROW": lambda size: np.tril_indices(size, -1),
+    "UPPER_DIAG_ROW": lambda size: np.triu_indices(size, 0),
+    "LOWER_DIAG_ROW": lambda size: np.tril_indices(size, 0),
+    "UPPER_COL": lambda size: np.tril_indices(size, -1),
+    "LOWER_COL": lambda size: np.triu_indices(size, 1),
+    "UPPER_DIAG_COL": lambda size: np.tril_indices(size, 0),
+    "LOWER_DIAG_COL": lambda size: np.triu_indices(size, 0),
+}
+
+
+class Instance(typing.NamedTuple):
+    name: str
+    coordinates: typing.Optional[np.ndarray]  # (n, 2) array
+    matrix: typing.Optional[np.ndarray]  # (n, n) array of explicit distances
+    distance_calculator: typing.Optional[DistanceCalculatorType]
+
+    def __len__(self):
+        return len(self.coordinates if self.coordinates is not None else self.matrix)
+
+    def solver_arguments(self) -> typing.Dict[str, typing.Any]:
+        """
+        TSPSolver arguments, locations are row indexes of coordinates. instances without coordinates give a dict of
+        indexes without coordinates.
+        """
+        arguments = dict(data=self.coordinates if self.coordinates is not None else dict.fromkeys(range(len(self))))
+        if self.matrix is not None:
+            arguments.update(distance_matrix_result=self.matrix)
+        if self.distance_calculator is not None:
+            arguments.update(distance_calculator=self.distance_calculator)
+        return arguments
+
+
+def parse_numbers(
+        text,  # type: str
+        columns=None,  # type: typing.Optional[int]
+) -> np.ndarray:
+    """
+    :param text: whitespace separated numbers, converted by numpy in one pass
+    :param columns: numbers of each row, 1d array is returned if not given
+    """
+    try:
+        values = np.array(text.split(), dtype=np.float64)
+    except ValueError as error:
+        raise ValueError("text has values that aren't numbers, %s" % error) from None
+    if columns is None:
+        return values
+    if values.size % columns:
+        raise ValueError("%d numbers can't be read as rows of %d columns" % (values.size, columns))
+    return values.reshape(-1, columns)
+
+
+def load_tsplib(
+        path,  # type: typing.Union[str, os.PathLike]
+) -> Instance:
+    """
+    reads NODE_COORD_SECTION of EUC_2D, ATT and GEO instances and EDGE_WEIGHT_SECTION of EXPLICIT instances.
+    """
+    text = pathlib.Path(path).read_text()
+    # numbers of the sections are not split into lines, only the first line of each section is kept
+    sections = {}
+    for match in TSPLIB_SECTION_PATTERN.finditer(text):
+        sections.setdefault(match.group(1), (match.start(), match.end()))
+    sections = sorted((start, end, section) for section, (start, end) in sections.items())
+    header_end = sections[0][0] if sections else len(text)
+    specification = {}
+    for line in text[:header_end].splitlines():
+        key, _, value = line.partition(":")
+        if key.strip():
+            specification[key.strip().upper()] = value.strip()
+    size = int(specification["DIMENSION"])
+    edge_weight_type = specification.get("EDGE_WEIGHT_TYPE", "EXPLICIT")
+    if edge_weight_type != "EXPLICIT" and edge_weight_type not in TSPLIB_EDGE_WEIGHT_TYPES:
+        raise ValueError("edge weight type %s is not supported" % edge_weight_type)
+    bodies = {section: text[end:following[0] if following else len(text)]
+              for (start, end, section), following in zip(sections, sections[1:] + [None])}
+    coordinates, matrix = None, None
+    coordinate_section = bodies.get("NODE_COORD_SECTION", bodies.get("DISPLAY_DATA_SECTION"))
+    if coordinate_section is not None:
+        nodes = parse_numbers(coordinate_section)
+        nodes = nodes.reshape(size, nodes.size // size)
+        coordinates = nodes[np.argsort(nodes[:, 0], kind="stable"), 1:3]
+    if edge_weight_type == "EXPLICIT":
+        values = parse_numbers(bodies["EDGE_WEIGHT_SECTION"])
+        edge_weight_format = specification.get("EDGE_WEIGHT_FORMAT", "FULL_MATRIX")
+        if edge_weight_format == "FULL_MATRIX":
+            matrix = values[:size * size].reshape(size, size)
+        elif edge_weight_format in TSPLIB_EDGE_WEIGHT_FORMATS:
+            rows, columns = TSPLIB_EDGE_WEIGHT_FORMATS[edge_weight_format](size)
+            matrix = np.zeros((size, size), dtype=np.float64)
+            matrix[rows, columns] = values[:len(rows)]
+            matrix[columns, rows] = values[:len(rows)]
+        else:
+            raise ValueError("edge weight format %s is not supported" % edge_weight_format)
+    elif coordinates is None:
+        raise ValueError("%s has no NODE_COORD_SECTION" % path)
+    return Instance(name=specification.get("NAME", pathlib.Path(path).stem), coordinates=coordinates, matrix=matrix,
+                    distance_calculator=TSPLIB_EDGE_WEIGHT_TYPES.get(edge_weight_type))
+
+
+def load_csv(
+        path,  # type: typing.Union[str, os.PathLike]
+        delimiter=None,  # type: typing.Optional[str]
+        columns=(0, 1),  # type: typing.Tuple[int, int]
+        comments="#",  # type: str
+        distance_calculator=None,  # type: typing.Optional[DistanceCalculatorType]
+) -> Instance:
+    """
+    reads a coordinate file with a row for each location with the csv module, values can be quoted. only columns are
+    converted to numbers, other columns can have any value. the first row is skipped as a header if its coordinates
+    aren't numbers.
+    :param delimiter: delimiter of values, spaces and tabs if not given
+    :param columns: columns of the two coordinates
+    :param comments: lines that start with comments are skipped
+    """
+    coordinates = array("d")
+    first_row = True
+    with open(path, newline="") as csv_file:
+        lines = csv_file if delimiter is not None else (line.replace("\t", " ").strip() for line in csv_file)
+        reader = csv.reader(lines, delimiter=delimiter or " ", skipinitialspace=delimiter is None)
+        for row in reader:
+            if not row or row[0].lstrip().startswith(comments):
+                continue
+            header, first_row = first_row, False
+            if len(row) <= max(columns):
+                raise ValueError("%s line %d has %d columns, coordinates are in columns %s" % (
+                    path, reader.line_num, len(row), columns))
+            try:
+                coordinate = [float(row[column]) for column in columns]
+            except ValueError:
+                if header:
+                    continue
+                raise ValueError("%s line %d has coordinates that aren't numbers: %s" % (
+                    path, reader.line_num, ", ".join(row[column] for column in columns))) from None
+            coordinates.extend(coordinate)
+    return Instance(name=pathlib.Path(path).stem, coordinates=np.frombuffer(coordinates).reshape(-1, 2),
+                    matrix=None, distance_calculator=distance_calculator)
+
+
+def load_binary(
+        path,  # type: typing.Union[str, os.PathLike]
+        dtype=np.float64,  # type: np.dtype
+        offset=0,  # type: int
+        distance_calculator=None,  # type: typing.Optional[DistanceCalculatorType]
+) -> Instance:
+    """
+    memory maps .npy files or raw files of (x, y) pairs, coordinates are read when they are used.
+    :param dtype: dtype of raw files
+    :param offset: header size of raw files in bytes
+    """
+    if pathlib.Path(path).suffix == ".npy":
+        coordinates = np.load(path, mmap_mode="r")
+    else:
+        coordinates = np.memmap(path, dtype=dtype, mode="r", offset=offset).reshape(-1, 2)
+    return Instance(name=pathlib.Path(path).stem, coordinates=coordinates, matrix=None,
+                    distance_calculator=distance_calculator)
+
+
+LoaderChoices = OrderedDict(
+    [
+        (".tsp", load_tsplib),
+        (".npy", load_binary),
+        (".bin", load_binary),
+        (".csv", load_csv),
+        (".txt", load_csv),
+    ]
+)
+
+
+def load(
+        path,  # type: typing.Union[str, os.PathLike]
+        **kwargs
+) -> Instance:
+    """
+    chooses the loader with the file suffix, files with other suffixes are read as csv.
+    :param kwargs: arguments of the loader
+    """
+    return LoaderChoices.get(pathlib.Path(path).suffix.lower(), load_csv)(path, **kwargs)
@@ -0,0 +1,116 @@
+import hashlib
+import os
+import pathlib
+import tempfile
+import typing
+
+import numpy as np
+
+from solvers import distance
+
+
+class DistanceMatrixCache:
+    """
+    keeps distance matrices in a directory as .npy files and opens them with numpy.memmap, so processes that solve
+    the same locations share one page cached copy of the matrix.
+    files are named with a hash of the coordinates and the distance calculator. when total size of the files exceeds
+    max_size, least recently used files are removed.
+    """
+
+    def __init__(self,
+                 directory,  # type: typing.Union[str, pathlib.Path]
+                 max_size=2 ** 30,  # type: typing.Optional[int]
+                 ):
+        """
+        :param directory: cache directory, it is created if it doesn't exist
+        :param max_size: maximum total size of cached matrices in bytes, None for no limit
+        """
+        self.directory = pathlib.Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+
+    @staticmethod
+    def calculator_identity(distance_calculator) -> typing.Optional[str]:
+        """
+        lambdas and local functions have no stable name, their matrices are not cached.
+        """
+        if isinstance(distance_calculator, distance.DistanceCalculatorType):
+            return str(distance_calculator)
+        name = getattr(distance_calculator, "__qualname__", None)
+        if not name or "<lambda>" in name or "<locals>" in name:
+            return None
+        return "%s.%s" % (distance_calculator.__module__, name)
+
+    def key(self,
+            coordinates,  # type: np.ndarray
+            distance_calculator,
+            ) -> typing.Optional[str]:
+        identity = self.calculator_identity(distance_calculator)
+        if identity is None:
+            return None
+        coordinates = np.ascontiguousarray(coordinates, dtype=np.float64)
+        digest = hashlib.sha256(identity.encode())
+        digest.update(str(coordinates.shape).encode())
+        digest.update(coordinates.tobytes())
+        return digest.hexdigest()
+
+    def path(self, key) -> pathlib.Path:
+        return self.directory.joinpath("%s.npy" % key)
+
+    def get(self, key) -> typing.Optional[np.ndarray]:
+        path = self.path(key)
+        try:
+            matrix = np.load(path, mmap_mode="r")
+            os.utime(path)
+        except (FileNotFoundError, ValueError):
+            return None
+        return matrix
+
+    def set(self,
+            key,  # type: str
+            matrix,  # type: np.ndarray
+            ) -> np.ndarray:
+        """
+        matrix is written to a temporary file and renamed, so other processes never open a partially written file.
+        """
+        path = self.path(key)
+        # each writer has its own temporary file, threads of a process writing the same key don't share one
+        with tempfile.NamedTemporaryFile(dir=self.directory, prefix=key, suffix=".tmp", delete=False) as matrix_file:
+            np.save(matrix_file, np.ascontiguousarray(matrix, dtype=np.float64))
+        os.replace(matrix_file.name, path)
+        self.evict(keep=path)
+        return np.load(path, mmap_mode="r")
+
+    def evict(self, keep=None):
+        """
+        removes least recently used matrices until total size is below max_size.
+        :param keep: path that will not be removed
+        """
+        if self.max_size is None:
+            return
+        files = []
+        for path in self.directory.glob("*.npy"):
+            try:
+                files.append((path.stat().st_mtime, path.stat().st_size, path))
+            except FileNotFoundError:
+                continue
+        total_size = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total_size <= self.max_size:
+                break
+            if path == keep:
+                continue
+            path.unlink(missing_ok=True)
+            total_size -= size
+
+    def distance_matrix(self,
+                        coordinates,  # type: np.ndarray
+                        distance_calculator,
+                        ) -> np.ndarray:
+        key = self.key(coordinates, distance_calculator)
+        if key is None:
+            return distance.distance_matrix(coordinates, distance_calculator)
+        matrix = self.get(key)
+        if matrix is None:
+            matrix = self.set(key, distance.distance_matrix(coordinates, distance_calculator))
+        return matrix
@@ -0,0 +1,246 @@
+import math
+import typing
+from collections import OrderedDict
+from collections.abc import Hashable
+from enum import Enum
+
+import geopy.distance as geopy_distance
+import numpy as np
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+
+EARTH_RADIUS = 6371.009  # mean earth radius in km, same as geopy great circle distance
+TSPLIB_EARTH_RADIUS = 6378.388  # earth radius of TSPLIB GEO distances
+TSPLIB_PI = 3.141592  # pi of TSPLIB GEO distances
+BATCH_SIZE = 2 ** 20  # number of distances calculated in each numpy batch
+
+
+class DistanceCalculatorType(Enum):
+    HAVERSINE = 1  # great circle distance in km, coordinates are (latitude, longitude)
+    EUCLIDEAN = 2  # straight line distance, coordinates are (x, y)
+    EUC_2D = 3  # TSPLIB EUC_2D, euclidean distance rounded to the nearest integer
+    ATT = 4  # TSPLIB ATT, pseudo euclidean distance rounded up
+    GEO = 5  # TSPLIB GEO, great circle distance of (latitude, longitude) in DDD.MM format, truncated to km
+
+
+def haversine(origin, destination) -> float:
+    latitude_1, latitude_2 = math.radians(origin[0]), math.radians(destination[0])
+    a = math.sin((latitude_2 - latitude_1) / 2.0) ** 2 + \
+        math.cos(latitude_1) * math.cos(latitude_2) * math.sin(math.radians(destination[1] - origin[1]) / 2.0) ** 2
+    return 2 * EARTH_RADIUS * math.asin(math.sqrt(a))
+
+
+def euclidean(origin, destination) -> float:
+    return math.hypot(destination[0] - origin[0], destination[1] - origin[1])
+
+
+def haversine_batch(
+        origins,  # type: np.ndarray
+        destinations,  # type: np.ndarray
+) -> np.ndarray:
+    """
+    :param origins: (m, 2) array of (latitude, longitude)
+    :param destinations: (k, 2) array of (latitude, longitude)
+    :return distances: (m, k) array of distances in km
+    """
+    origins, destinations = np.radians(origins), np.radians(destinations)
+    latitude_1, latitude_2 = origins[:, 0, None], destinations[None, :, 0]
+    a = np.sin((latitude_2 - latitude_1) / 2.0) ** 2 + \
+        np.cos(latitude_1) * np.cos(latitude_2) * np.sin((destinations[None, :, 1] - origins[:, 1, None]) / 2.0) ** 2
+    return 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def euclidean_batch(
+        origins,  # type: np.ndarray
+        destinations,  # type: np.ndarray
+) -> np.ndarray:
+    return np.hypot(destinations[None, :, 0] - origins[:, 0, None], destinations[None, :, 1] - origins[:, 1, None])
+
+
+def euc_2d_batch(
+        origins,  # type: np.ndarray
+        destinations,  # type: np.ndarray
+) -> np.ndarray:
+    return np.floor(euclidean_batch(origins, destinations) + 0.5)
+
+
+def att_batch(
+        origins,  # type: np.ndarray
+        destinations,  # type: np.ndarray
+) -> np.ndarray:
+    distances = euclidean_batch(origins, destinations) / math.sqrt(10)
+    rounded = np.floor(distances + 0.5)
+    return np.where(rounded < distances, rounded + 1, rounded)
+
+
+def geo_radians(
+        coordinates,  # type: np.ndarray
+) -> np.ndarray:
+    """
+    DDD.MM degrees and minutes to radians as TSPLIB does.
+    """
+    degrees = np.trunc(coordinates)
+    return TSPLIB_PI * (degrees + 5.0 * (coordinates - degrees) / 3.0) / 180.0
+
+
+def geo_batch(
+        origins,  # type: np.ndarray
+        destinations,  # type: np.ndarray
+) -> np.ndarray:
+    origins, destinations = geo_radians(origins), geo_radians(destinations)
+    latitude_1, latitude_2 = origins[:, 0, None], destinations[None, :, 0]
+    q1 = np.cos(origins[:, 1, None] - destinations[None, :, 1])
+    q2, q3 = np.cos(latitude_1 - latitude_2), np.cos(latitude_1 + latitude_2)
+    return np.trunc(TSPLIB_EARTH_RADIUS * np.arccos(np.clip(0.5 * ((1 + q1) * q2 - (1 - q1) * q3), -1, 1)) + 1.0)
+
+
+DistanceBatchChoices = OrderedDict(
+    [
+        (DistanceCalculatorType.HAVERSINE.value, haversine_batch),
+        (DistanceCalculatorType.EUCLIDEAN.value, euclidean_batch),
+        (DistanceCalculatorType.EUC_2D.value, euc_2d_batch),
+        (DistanceCalculatorType.ATT.value, att_batch),
+        (DistanceCalculatorType.GEO.value, geo_batch),
+    ]
+)
+
+# per pair calculators that have a vectorized equivalent
+VECTORIZED_CALCULATORS = {
+    haversine: DistanceCalculatorType.HAVERSINE,
+    euclidean: DistanceCalculatorType.EUCLIDEAN,
+    geopy_distance.great_circle: DistanceCalculatorType.HAVERSINE,
+}
+
+# per pair calculators that are known to be symmetric, only upper triangle of their matrix is calculated
+SYMMETRIC_CALCULATORS = {geopy_distance.geodesic}
+
+
+def calculator_type(
+        distance_calculator,  # type: typing.Union[DistanceCalculatorType, typing.Callable]
+) -> typing.Optional[DistanceCalculatorType]:
+    """
+    :return distance_calculator_type: type of the calculator or of its vectorized equivalent, None for other
+    calculators, unhashable callables included
+    """
+    if isinstance(distance_calculator, DistanceCalculatorType):
+        return distance_calculator
+    if isinstance(distance_calculator, Hashable):
+        return VECTORIZED_CALCULATORS.get(distance_calculator)
+    return None
+
+
+def symmetric_calculator(
+        distance_calculator,  # type: typing.Union[DistanceCalculatorType, typing.Callable]
+) -> bool:
+    return calculator_type(distance_calculator) is not None or \
+        (isinstance(distance_calculator, Hashable) and distance_calculator in SYMMETRIC_CALCULATORS)
+
+
+def symmetric_distance_matrix(
+        coordinates,  # type: np.ndarray
+        distance_calculator_type,  # type: DistanceCalculatorType
+) -> np.ndarray:
+    """
+    calculates upper triangle of the matrix in row batches and mirrors each batch to the lower triangle.
+    """
+    distance_batch = DistanceBatchChoices[distance_calculator_type.value]
+    number_of_point = len(coordinates)
+    matrix = np.empty((number_of_point, number_of_point), dtype=np.float64)
+    batch_rows = max(1, BATCH_SIZE // max(1, number_of_point))
+    for row in range(0, number_of_point, batch_rows):
+        row_end = min(row + batch_rows, number_of_point)
+        distances = distance_batch(coordinates[row:row_end], coordinates[row:])
+        matrix[row:row_end, row:] = distances
+        matrix[row:, row:row_end] = distances.T
+    np.fill_diagonal(matrix, 0)
+    return matrix
+
+
+def pairwise_distance_matrix(
+        coordinates,  # type: np.ndarray
+        distance_calculator,  # type: typing.Callable
+        symmetric=False,  # type: bool
+) -> np.ndarray:
+    """
+    calls distance_calculator for each pair, geopy distances are converted to km.
+    """
+    number_of_point = len(coordinates)
+    points = [tuple(coord) for coord in coordinates.tolist()]
+    matrix = np.zeros((number_of_point, number_of_point), dtype=np.float64)
+    for index, point in enumerate(points):
+        for index_inner in range(index + 1 if symmetric else 0, number_of_point):
+            if index_inner == index:
+                continue
+            distance = distance_calculator(point, points[index_inner])
+            matrix[index, index_inner] = getattr(distance, "km", distance)
+    if symmetric:
+        matrix += matrix.T
+    return matrix
+
+
+def distance_matrix(
+        coordinates,  # type: np.ndarray
+        distance_calculator,  # type: typing.Union[DistanceCalculatorType, typing.Callable]
+) -> np.ndarray:
+    """
+    :param coordinates: (n, 2) array of coordinates
+    :param distance_calculator: DistanceCalculatorType or a function that calculates distance between two coordinates
+    :return matrix: (n, n) float64 distance matrix
+    """
+    distance_calculator_type = calculator_type(distance_calculator)
+    if distance_calculator_type:
+        return symmetric_distance_matrix(coordinates, distance_calculator_type)
+    return pairwise_distance_matrix(coordinates, distance_calculator,
+                                    symmetric=symmetric_calculator(distance_calculator))
+
+
+def tree_points(
+        coordinates,  # type: np.ndarray
+        distance_calculator_type,  # type: DistanceCalculatorType
+) -> np.ndarray:
+    """
+    points whose euclidean distances are ordered like the distances of distance_calculator_type, latitude and
+    longitude are converted to points on the unit sphere.
+    """
+    if distance_calculator_type in (DistanceCalculatorType.EUCLIDEAN, DistanceCalculatorType.EUC_2D,
+                                    DistanceCalculatorType.ATT):
+        return coordinates
+    if distance_calculator_type == DistanceCalculatorType.GEO:
+        latitude, longitude = geo_radians(coordinates[:, 0]), geo_radians(coordinates[:, 1])
+    else:
+        latitude, longitude = np.radians(coordinates[:, 0]), np.radians(coordinates[:, 1])
+    return np.column_stack([np.cos(latitude) * np.cos(longitude), np.cos(latitude) * np.sin(longitude),
+                            np.sin(latitude)])
+
+
+def nearest_neighbours(
+        coordinates,  # type: np.ndarray
+        matrix,  # type: np.ndarray
+        k,  # type: int
+        distance_calculator=None,  # type: typing.Union[DistanceCalculatorType, typing.Callable, None]
+) -> np.ndarray:
+    """
+    :return neighbours: (n, k) array, k nearest locations of each location from nearest to farthest. a kd-tree of
+    coordinates is used for haversine and euclidean distances if scipy is installed, rows of matrix otherwise.
+    """
+    number_of_point = len(matrix)
+    distance_calculator_type = calculator_type(distance_calculator)
+    if cKDTree is not None and distance_calculator_type:
+        _, neighbours = cKDTree(tree_points(coordinates, distance_calculator_type)).query(
+            tree_points(coordinates, distance_calculator_type), k=k + 1)
+        neighbours = neighbours.reshape(number_of_point, k + 1)
+        return np.array([[neighbour for neighbour in row if neighbour != location][:k]
+                         for location, row in enumerate(neighbours.tolist())])
+    neighbours = np.empty((number_of_point, k), dtype=np.int64)
+    batch_rows = max(1, BATCH_SIZE // max(1, number_of_point))
+    for row in range(0, number_of_point, batch_rows):
+        row_end = min(row + batch_rows, number_of_point)
+        distances = np.array(matrix[row:row_end], dtype=np.float64)
+        distances[np.arange(row_end - row), np.arange(row, row_end)] = np.inf
+        nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        order = np.argsort(np.take_along_axis(distances, nearest, axis=1), axis=1)
+        neighbours[row:row_end] = np.take_along_axis(nearest, order, axis=1)
+    return neighbours
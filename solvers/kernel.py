@@ -0,0 +1,248 @@
+"""
+annealing loop of TSPSolver over an integer plan array and the distance matrix. the same function is compiled with
+numba when it is installed and runs as python code otherwise, both consume the same blocks of random numbers so they
+give the same result for a seed.
+"""
+import math
+
+from algorithm.cooling_schedule import CoolingScheduleType
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+if numba is not None:
+    jit = numba.njit(cache=True)
+else:
+    def jit(function):
+        return function
+
+SWAP, TWO_OPT, OR_OPT, INSERTION = 1, 2, 3, 4  # MoveType values
+LOGARITHMIC = CoolingScheduleType.LOGARITHMIC.value
+GEOMETRIC = CoolingScheduleType.GEOMETRIC.value
+EXPONENTIAL = CoolingScheduleType.EXPONENTIAL.value
+KERNEL_COOLING_SCHEDULES = {CoolingScheduleType.LOGARITHMIC, CoolingScheduleType.GEOMETRIC,
+                            CoolingScheduleType.EXPONENTIAL}
+
+# indexes of counters, JOURNAL_LENGTH is -1 when the journal is dropped
+UNIFORM_INDEX, THRESHOLD_INDEX, K, STEP, GENERATED, STATE_OPEN, STOPPED, JOURNAL_LENGTH, BEST_MARK = range(9)
+# indexes of values
+TEMPERATURE, ENERGY, INITIAL_TEMPERATURE, TEMPERATURE_MIN, COOLING_SPEED, N, BEST_ENERGY = range(7)
+UNIFORMS_PER_MOVE = 4  # move type, length, two indexes
+
+
+@jit
+def cooled_temperature(values, cooling_schedule_type, k):
+    if cooling_schedule_type == LOGARITHMIC:
+        return values[COOLING_SPEED] * values[INITIAL_TEMPERATURE] / math.log1p(k)
+    if cooling_schedule_type == GEOMETRIC:
+        return values[COOLING_SPEED] ** k * values[INITIAL_TEMPERATURE]
+    return values[INITIAL_TEMPERATURE] * math.exp(-values[COOLING_SPEED] * k ** (1 / values[N]))
+
+
+@jit
+def random_index(uniform, size):
+    return min(int(uniform * size), size - 1)
+
+
+@jit
+def swapped_location(plan, index, index_1, index_2):
+    if index == index_1:
+        return plan[index_2]
+    if index == index_2:
+        return plan[index_1]
+    return plan[index]
+
+
+@jit
+def swap_variation(plan, matrix, index_1, index_2):
+    number_of_point = len(plan)
+    energy_variation = 0.0
+    for edge in (index_1, (index_1 + 1) % number_of_point, index_2, (index_2 + 1) % number_of_point):
+        if (edge == (index_1 + 1) % number_of_point and edge == index_2) or \
+                (edge == (index_2 + 1) % number_of_point and edge == index_1):
+            continue
+        previous = (edge - 1) % number_of_point
+        energy_variation += matrix[swapped_location(plan, previous, index_1, index_2),
+                                   swapped_location(plan, edge, index_1, index_2)] - matrix[plan[previous], plan[edge]]
+    return energy_variation
+
+
+@jit
+def two_opt_variation(plan, matrix, symmetric, index_1, index_2):
+    number_of_point = len(plan)
+    if index_2 - index_1 + 2 >= number_of_point and symmetric:
+        return 0.0
+    b, c = plan[index_1], plan[index_2]
+    if index_2 - index_1 + 1 == number_of_point:
+        energy_variation = matrix[b, c] - matrix[c, b]
+    else:
+        a, d = plan[index_1 - 1], plan[(index_2 + 1) % number_of_point]
+        energy_variation = matrix[a, c] + matrix[b, d] - matrix[a, b] - matrix[c, d]
+    if not symmetric:
+        for index in range(index_1, index_2):
+            energy_variation += matrix[plan[index + 1], plan[index]] - matrix[plan[index], plan[index + 1]]
+    return energy_variation
+
+
+@jit
+def relocation_variation(plan, matrix, index_1, index_2, index_3):
+    number_of_point = len(plan)
+    segment_start, segment_end = plan[index_1], plan[index_2]
+    previous, following = plan[index_1 - 1], plan[(index_2 + 1) % number_of_point]
+    target, target_next = plan[index_3], plan[(index_3 + 1) % number_of_point]
+    return matrix[previous, following] + matrix[target, segment_start] + matrix[segment_end, target_next] - \
+        matrix[previous, segment_start] - matrix[segment_end, following] - matrix[target, target_next]
+
+
+@jit
+def reverse(plan, index_1, index_2):
+    while index_1 < index_2:
+        plan[index_1], plan[index_2] = plan[index_2], plan[index_1]
+        index_1 += 1
+        index_2 -= 1
+
+
+@jit
+def relocate(plan, index_1, index_2, index_3):
+    """
+    same as TSPSolver.relocate_index, locations between the segment and index_3 are shifted over the segment.
+    """
+    length = index_2 - index_1 + 1
+    segment = plan[index_1:index_2 + 1].copy()
+    if index_3 > index_2:
+        for index in range(index_2 + 1, index_3 + 1):
+            plan[index - length] = plan[index]
+        plan[index_3 - length + 1:index_3 + 1] = segment
+    else:
+        for index in range(index_1 - 1, index_3, -1):
+            plan[index + length] = plan[index]
+        plan[index_3 + 1:index_3 + 1 + length] = segment
+
+
+@jit
+def apply_move(plan, move_type, index_1, index_2, index_3):
+    if move_type == SWAP:
+        plan[index_1], plan[index_2] = plan[index_2], plan[index_1]
+    elif move_type == TWO_OPT:
+        reverse(plan, index_1, index_2)
+    else:
+        relocate(plan, index_1, index_2, index_3)
+
+
+@jit
+def synchronize(best_plan, journal, counters):
+    """
+    same as BestSolution.synchronize, moves up to the mark are applied to best_plan and removed from the journal.
+    """
+    mark = counters[BEST_MARK]
+    for index in range(mark):
+        apply_move(best_plan, journal[index, 0], journal[index, 1], journal[index, 2], journal[index, 3])
+    length = counters[JOURNAL_LENGTH] - mark
+    journal[:length] = journal[mark:mark + length].copy()
+    counters[JOURNAL_LENGTH], counters[BEST_MARK] = length, 0
+
+
+@jit
+def record_best(plan, best_plan, journal, counters, values, move_type, index_1, index_2, index_3):
+    """
+    same as BestSolution.record for an accepted move, journal has a row for each move.
+    """
+    improved = values[ENERGY] < values[BEST_ENERGY]
+    if improved:
+        values[BEST_ENERGY] = values[ENERGY]
+    if counters[JOURNAL_LENGTH] < 0:
+        if improved:
+            best_plan[:] = plan
+            counters[JOURNAL_LENGTH], counters[BEST_MARK] = 0, 0
+        return
+    length = counters[JOURNAL_LENGTH]
+    journal[length, 0], journal[length, 1], journal[length, 2], journal[length, 3] = \
+        move_type, index_1, index_2, index_3
+    counters[JOURNAL_LENGTH] = length + 1
+    if improved:
+        counters[BEST_MARK] = length + 1
+    if counters[JOURNAL_LENGTH] == len(journal):
+        synchronize(best_plan, journal, counters)
+        if counters[JOURNAL_LENGTH] == len(journal):
+            counters[JOURNAL_LENGTH] = -1
+
+
+@jit
+def anneal(plan, matrix, symmetric, move_types, move_type_weights, max_segment, uniforms, thresholds, counters,
+           values, cooling_schedule_type, steps, best_plan, journal):
+    """
+    runs SMA.solve loop until temperature is below temperature_min or random numbers run out, it continues from
+    counters and values when it is called again with new random numbers. best plan is best_plan after
+    synchronize when JOURNAL_LENGTH isn't negative.
+    :param move_types: move type values, move_type_weights are their accumulated weights
+    :param uniforms: uniform random numbers for moves
+    :param thresholds: -ln(u) acceptance thresholds, used only for uphill moves
+    :param counters: int64 array, see counter indexes
+    :param values: float64 array, see value indexes
+    :param journal: (limit, 4) int64 array of the accepted moves after best_plan
+    """
+    number_of_point = len(plan)
+    while not counters[STOPPED]:
+        if not counters[STATE_OPEN]:
+            if values[TEMPERATURE] < values[TEMPERATURE_MIN]:
+                counters[STOPPED] = 1
+                break
+            counters[K] += 1
+            temperature = cooled_temperature(values, cooling_schedule_type, counters[K])
+            if temperature < values[TEMPERATURE_MIN]:
+                counters[STOPPED] = 1
+                break
+            values[TEMPERATURE] = temperature
+            counters[STEP], counters[STATE_OPEN] = 0, 1
+        while counters[STEP] <= steps:
+            if counters[UNIFORM_INDEX] + UNIFORMS_PER_MOVE > len(uniforms) or \
+                    counters[THRESHOLD_INDEX] >= len(thresholds):
+                return
+            move_type = move_types[0]
+            if len(move_types) > 1:
+                weight = uniforms[counters[UNIFORM_INDEX]] * move_type_weights[-1]
+                counters[UNIFORM_INDEX] += 1
+                move_type = move_types[-1]
+                for index in range(len(move_types)):
+                    if weight < move_type_weights[index]:
+                        move_type = move_types[index]
+                        break
+            if move_type == SWAP or move_type == TWO_OPT:
+                index_1 = random_index(uniforms[counters[UNIFORM_INDEX]], number_of_point)
+                index_2 = random_index(uniforms[counters[UNIFORM_INDEX] + 1], number_of_point - 1)
+                counters[UNIFORM_INDEX] += 2
+                if index_2 >= index_1:
+                    index_2 += 1
+                index_3 = -1
+                if move_type == SWAP:
+                    energy_variation = swap_variation(plan, matrix, index_1, index_2)
+                else:
+                    index_1, index_2 = min(index_1, index_2), max(index_1, index_2)
+                    energy_variation = two_opt_variation(plan, matrix, symmetric, index_1, index_2)
+            else:
+                length = 1
+                if move_type == OR_OPT:
+                    length = 1 + random_index(uniforms[counters[UNIFORM_INDEX]],
+                                              min(max_segment, number_of_point - 2))
+                    counters[UNIFORM_INDEX] += 1
+                index_1 = random_index(uniforms[counters[UNIFORM_INDEX]], number_of_point - length + 1)
+                index_2 = index_1 + length - 1
+                index_3 = (index_2 + 1 + random_index(uniforms[counters[UNIFORM_INDEX] + 1],
+                                                      number_of_point - length - 1)) % number_of_point
+                counters[UNIFORM_INDEX] += 2
+                energy_variation = relocation_variation(plan, matrix, index_1, index_2, index_3)
+            counters[GENERATED] += 1
+            counters[STEP] += 1
+            accepted = energy_variation <= 0
+            if not accepted:
+                accepted = energy_variation <= values[TEMPERATURE] * thresholds[counters[THRESHOLD_INDEX]]
+                counters[THRESHOLD_INDEX] += 1
+            if accepted:
+                apply_move(plan, move_type, index_1, index_2, index_3)
+                values[ENERGY] += energy_variation
+                record_best(plan, best_plan, journal, counters, values, move_type, index_1, index_2, index_3)
+                break
+        counters[STATE_OPEN] = 0
+
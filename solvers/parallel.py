@@ -0,0 +1,239 @@
+import concurrent.futures
+import math
+import multiprocessing
+import multiprocessing.synchronize
+import os
+import random
+import typing
+
+from algorithm.annealing import Solution
+from algorithm.cooling_schedule import CoolingScheduleType
+from solvers.tsp import TSPSolver
+
+worker_solver = None  # type: typing.Optional[TSPSolver]
+worker_solver_arguments = None  # type: typing.Optional[typing.Dict[str, typing.Any]]
+worker_stop_event = None  # type: typing.Optional[multiprocessing.synchronize.Event]
+
+# arguments that are only needed to calculate distance matrix, workers receive the matrix itself
+DISTANCE_ARGUMENTS = ("distance_calculator", "distance_matrix_cache", "distance_matrix_result")
+# arguments that parallel tempering sets itself, replicas run at fixed temperatures
+TEMPERING_ARGUMENTS = ("initial_temperature", "cooling_speed", "steps", "cooling_schedule_type")
+
+
+def initialize_worker(
+        solver_class,  # type: typing.Type[TSPSolver]
+        solver_arguments,  # type: typing.Dict[str, typing.Any]
+        stop_event=None,  # type: typing.Optional[multiprocessing.synchronize.Event]
+):
+    """
+    builds the solver once in each worker process, tasks only send plans or seeds.
+    """
+    global worker_solver, worker_solver_arguments, worker_stop_event
+    worker_solver = solver_class(**solver_arguments)
+    worker_solver_arguments = dict(solver_arguments, distance_matrix_result=worker_solver.distance_matrix)
+    worker_stop_event = stop_event
+
+
+def worker_arguments(
+        solver,  # type: TSPSolver
+        solver_arguments,  # type: typing.Dict[str, typing.Any]
+        **kwargs
+) -> typing.Dict[str, typing.Any]:
+    arguments = {key: value for key, value in solver_arguments.items() if key not in DISTANCE_ARGUMENTS}
+    arguments.update(solver.instance_arguments())
+    arguments.update(kwargs)
+    return arguments
+
+
+def run_replica(
+        plan,  # type: typing.Optional[typing.List[int]]
+        temperature,  # type: float
+        steps,  # type: int
+        seed,  # type: int
+) -> typing.Tuple[typing.List[int], float, typing.List[int], float]:
+    """
+    :return result: last plan and energy of the replica, best plan and energy of its steps
+    """
+    worker_solver.reseed(seed=seed)
+    worker_solver.best.clear()
+    solution = worker_solver.generate_initial_solution() if plan is None else Solution(plan=plan)
+    worker_solver.restart(solution=solution, temperature=temperature)
+    solution = worker_solver.sample(steps=steps)
+    best_solution = worker_solver.best_solution
+    return solution.plan, solution.energy, best_solution.plan, best_solution.energy
+
+
+class SharedStoppingCriteria:
+    """
+    stops the solver when any run in the pool reaches target energy.
+    """
+    stop_event = None  # type: multiprocessing.synchronize.Event
+    target_energy = None  # type: typing.Optional[float]
+
+    def stopping_criteria(self) -> bool:
+        if self.target_energy is not None and self.energy <= self.target_energy:
+            self.stop_event.set()
+        return self.stop_event.is_set() or super(SharedStoppingCriteria, self).stopping_criteria()
+
+
+def run_start(
+        seed,  # type: int
+        target_energy,  # type: typing.Optional[float]
+) -> typing.Tuple[int, typing.List[int], float]:
+    solver_class = type(worker_solver)
+    if worker_stop_event is not None:
+        solver_class = type(solver_class.__name__, (SharedStoppingCriteria, solver_class), dict(
+            stop_event=worker_stop_event, target_energy=target_energy))
+    solver = solver_class(**dict(worker_solver_arguments, seed=seed))
+    solver.solve()
+    best_solution = solver.best_solution
+    return seed, best_solution.plan, best_solution.energy
+
+
+class StartResult(typing.NamedTuple):
+    seed: int
+    plan: typing.List[typing.Any]
+    energy: float
+
+
+class MultiStartSolver:
+    """
+    runs independent solvers with different seeds in worker processes. workers receive locations and distance
+    matrix once, not the distance calculator.
+    """
+
+    def __init__(self,
+                 data,  # type: typing.Dict[typing.Any, typing.Tuple[float, float]]
+                 starts=8,  # type: int
+                 max_workers=None,  # type: typing.Optional[int]
+                 seed=None,  # type: typing.Optional[int]
+                 target_energy=None,  # type: typing.Optional[float]
+                 solver_class=TSPSolver,  # type: typing.Type[TSPSolver]
+                 **solver_arguments):
+        """
+        :param starts: number of independent runs
+        :param target_energy: when a run reaches target energy, remaining runs are cancelled and running ones stop
+        at their next temperature.
+        :param solver_arguments: TSPSolver arguments, distance matrix is calculated once and sent to the workers
+        """
+        self.starts = starts
+        self.max_workers = max_workers or min(starts, os.cpu_count() or 1)
+        seed_random = random.Random(seed)
+        self.seeds = [seed_random.getrandbits(32) for _ in range(starts)]  # type: typing.List[int]
+        self.target_energy = target_energy
+        self.solver_class = solver_class
+        self.solver_arguments = solver_arguments
+        self.solver = solver_class(data=data, **solver_arguments)
+        self.best = None  # type: typing.Optional[StartResult]
+
+    def iter_solve(self) -> typing.Iterator[StartResult]:
+        """
+        yields result of each run as soon as it finishes.
+        """
+        stop_event = multiprocessing.Event() if self.target_energy is not None else None
+        arguments = worker_arguments(self.solver, self.solver_arguments)
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.max_workers, initializer=initialize_worker,
+                initargs=(self.solver_class, arguments, stop_event)) as executor:
+            futures = [executor.submit(run_start, seed, self.target_energy) for seed in self.seeds]
+            for future in concurrent.futures.as_completed(futures):
+                if future.cancelled():
+                    continue
+                seed, plan, energy = future.result()
+                result = StartResult(seed=seed, plan=self.solver.decode_plan(plan), energy=energy)
+                if self.best is None or result.energy < self.best.energy:
+                    self.best = result
+                if self.target_energy is not None and energy <= self.target_energy:
+                    stop_event.set()
+                    for pending_future in futures:
+                        pending_future.cancel()
+                yield result
+
+    def solve(self) -> typing.List[typing.Any]:
+        for _ in self.iter_solve():
+            pass
+        return self.best.plan
+
+
+class ParallelTemperingSolver:
+    """
+    replica exchange: each replica runs metropolis algorithm at a fixed temperature in a worker process. after every
+    exchange_steps, neighbouring replicas i, j exchange their solutions with probability
+    min(1, exp((1/T_i - 1/T_j) * (E_i - E_j))).
+    """
+
+    def __init__(self,
+                 data,  # type: typing.Dict[typing.Any, typing.Tuple[float, float]]
+                 temperature_max,  # type: float
+                 temperature_min,  # type: float
+                 replicas=8,  # type: int
+                 exchange_steps=1000,  # type: int
+                 exchanges=100,  # type: int
+                 max_workers=None,  # type: typing.Optional[int]
+                 seed=None,  # type: typing.Optional[int]
+                 solver_class=TSPSolver,  # type: typing.Type[TSPSolver]
+                 **solver_arguments):
+        """
+        :param temperature_max: temperature of the hottest replica
+        :param temperature_min: temperature of the coldest replica, temperatures between are geometrically spaced
+        :param exchange_steps: metropolis steps of each replica between exchanges
+        :param exchanges: number of exchange rounds
+        :param solver_arguments: TSPSolver arguments except the temperature arguments, distance matrix is calculated
+        once and sent to the workers
+        """
+        fixed_arguments = [key for key in TEMPERING_ARGUMENTS if key in solver_arguments]
+        if fixed_arguments:
+            raise ValueError("parallel tempering sets %s itself, use temperature_max, temperature_min and "
+                             "exchange_steps instead" % ", ".join(fixed_arguments))
+        self.replicas = replicas
+        self.temperatures = [
+            temperature_min * (temperature_max / temperature_min) ** (index / max(1, replicas - 1))
+            for index in range(replicas)
+        ]  # type: typing.List[float]
+        self.exchange_steps = exchange_steps
+        self.exchanges = exchanges
+        self.max_workers = max_workers or min(replicas, os.cpu_count() or 1)
+        self.random = random.Random(seed)
+        self.solver_class = solver_class
+        self.solver_arguments = solver_arguments
+        self.solver = solver_class(
+            data=data, initial_temperature=temperature_max, temperature_min=temperature_min, cooling_speed=1,
+            steps=exchange_steps, cooling_schedule_type=CoolingScheduleType.GEOMETRIC, **solver_arguments)
+        self.plans = [None] * replicas  # type: typing.List[typing.Optional[typing.List[int]]]
+        self.energies = [math.inf] * replicas  # type: typing.List[float]
+        self.accepted_exchanges = [0] * (replicas - 1)  # type: typing.List[int]
+        self.best_plan, self.best_energy = None, math.inf
+
+    def exchange(self,
+                 exchange,  # type: int
+                 ):
+        """
+        even and odd neighbour pairs exchange in turns.
+        """
+        for index in range(exchange % 2, self.replicas - 1, 2):
+            inverse_temperature_variation = 1 / self.temperatures[index] - 1 / self.temperatures[index + 1]
+            probability_exponent = inverse_temperature_variation * (self.energies[index] - self.energies[index + 1])
+            if probability_exponent >= 0 or self.random.random() < math.exp(probability_exponent):
+                self.plans[index], self.plans[index + 1] = self.plans[index + 1], self.plans[index]
+                self.energies[index], self.energies[index + 1] = self.energies[index + 1], self.energies[index]
+                self.accepted_exchanges[index] += 1
+
+    def solve(self) -> typing.List[typing.Any]:
+        arguments = worker_arguments(
+            self.solver, self.solver_arguments, initial_temperature=self.temperatures[-1],
+            temperature_min=self.temperatures[0], cooling_speed=1, steps=self.exchange_steps,
+            cooling_schedule_type=CoolingScheduleType.GEOMETRIC)
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.max_workers, initializer=initialize_worker,
+                initargs=(self.solver_class, arguments)) as executor:
+            for exchange in range(self.exchanges):
+                futures = [
+                    executor.submit(run_replica, plan, temperature, self.exchange_steps, self.random.getrandbits(32))
+                    for plan, temperature in zip(self.plans, self.temperatures)
+                ]
+                for index, future in enumerate(futures):
+                    self.plans[index], self.energies[index], best_plan, best_energy = future.result()
+                    if best_energy < self.best_energy:
+                        self.best_plan, self.best_energy = best_plan, best_energy
+                self.exchange(exchange)
+        return self.solver.decode_plan(self.best_plan)
@@ -0,0 +1,193 @@
+import concurrent.futures
+import csv
+import itertools
+import json
+import os
+import pathlib
+import random
+import time
+import typing
+import zlib
+
+import numpy as np
+
+from solvers import parallel
+from solvers.tsp import TSPSolver
+
+try:
+    import pandas
+except ImportError:
+    pandas = None
+
+RESULT_FIELDS = ("repeat", "seed", "energy", "elapsed_time", "total_generated_solution")
+
+
+def grid(
+        parameters,  # type: typing.Dict[str, typing.Sequence]
+) -> typing.List[typing.Dict[str, typing.Any]]:
+    """
+    :param parameters: values of each parameter, e.g. {"cooling_speed": [0.9, 0.99]}
+    :return configurations: every combination of the values
+    """
+    names = list(parameters)
+    return [dict(zip(names, values)) for values in itertools.product(*(parameters[name] for name in names))]
+
+
+def random_samples(
+        parameters,  # type: typing.Dict[str, typing.Union[typing.Tuple[float, float], typing.Sequence]]
+        samples,  # type: int
+        seed=None,  # type: typing.Optional[int]
+) -> typing.List[typing.Dict[str, typing.Any]]:
+    """
+    :param parameters: (low, high) tuple for uniformly sampled parameters, list for parameters chosen from values
+    """
+    sample_random = random.Random(seed)
+    return [
+        {name: sample_random.uniform(*values) if isinstance(values, tuple) else sample_random.choice(values)
+         for name, values in parameters.items()}
+        for _ in range(samples)
+    ]
+
+
+def latin_hypercube(
+        parameters,  # type: typing.Dict[str, typing.Tuple[float, float]]
+        samples,  # type: int
+        seed=None,  # type: typing.Optional[int]
+) -> typing.List[typing.Dict[str, float]]:
+    """
+    each (low, high) range is divided into samples intervals and every interval is sampled exactly once.
+    """
+    generator = np.random.default_rng(seed)
+    columns = {}
+    for name, (low, high) in parameters.items():
+        points = (generator.permutation(samples) + generator.random(samples)) / samples
+        columns[name] = low + points * (high - low)
+    return [{name: float(column[index]) for name, column in columns.items()} for index in range(samples)]
+
+
+def configuration_key(
+        configuration,  # type: typing.Dict[str, typing.Any]
+        repeat,  # type: int
+) -> str:
+    return json.dumps(dict({name: str(value) for name, value in configuration.items()}, repeat=str(repeat)),
+                      sort_keys=True)
+
+
+def run_configuration(
+        configuration,  # type: typing.Dict[str, typing.Any]
+        seed,  # type: int
+) -> typing.Tuple[float, float, int]:
+    start_time = time.time()
+    solver = type(parallel.worker_solver)(**dict(parallel.worker_solver_arguments, seed=seed, **configuration))
+    solver.solve()
+    return solver.best.energy, time.time() - start_time, solver.total_generated_solution
+
+
+class Sweep:
+    """
+    runs solver with each configuration in a process pool and appends best energy, elapsed time and total generated
+    solutions of each run to a csv file. runs that are already in the file are skipped, so an interrupted sweep
+    continues where it stopped.
+    """
+
+    def __init__(self,
+                 data,  # type: typing.Dict[typing.Any, typing.Tuple[float, float]]
+                 configurations,  # type: typing.List[typing.Dict[str, typing.Any]]
+                 path,  # type: typing.Union[str, pathlib.Path]
+                 repeats=1,  # type: int
+                 max_workers=None,  # type: typing.Optional[int]
+                 seed=0,  # type: int
+                 solver_class=TSPSolver,  # type: typing.Type[TSPSolver]
+                 **solver_arguments):
+        """
+        :param configurations: solver arguments of each run, e.g. from grid, random_samples or latin_hypercube
+        :param path: csv file of results
+        :param repeats: number of runs with different seeds for each configuration
+        :param solver_arguments: arguments shared by all runs, distance matrix is calculated once
+        """
+        self.configurations = configurations
+        self.path = pathlib.Path(path)
+        self.repeats = repeats
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.seed = seed
+        self.solver_class = solver_class
+        self.solver_arguments = solver_arguments
+        self.parameter_names = list(dict.fromkeys(name for configuration in configurations for name in configuration))
+        self.solver = solver_class(data=data, **dict(solver_arguments, **configurations[0]))
+
+    def fieldnames(self) -> typing.List[str]:
+        """
+        :return fieldnames: header of the existing csv file, so resumed rows line up with its columns, or parameter
+        names and result fields for a new file
+        """
+        fieldnames = self.parameter_names + list(RESULT_FIELDS)
+        if not self.path.exists() or not self.path.stat().st_size:
+            return fieldnames
+        with open(self.path, newline="") as result_file:
+            header = next(csv.reader(result_file), [])
+        missing = [name for name in fieldnames if name not in header]
+        if missing:
+            raise ValueError("%s has no %s columns, write the results of these configurations to another file"
+                             % (self.path, ", ".join(missing)))
+        return header
+
+    def completed_keys(self) -> typing.Set[str]:
+        if not self.path.exists():
+            return set()
+        with open(self.path, newline="") as result_file:
+            return {
+                configuration_key({name: row[name] for name in self.parameter_names if row.get(name)}, row["repeat"])
+                for row in csv.DictReader(result_file)
+            }
+
+    def pending_runs(self) -> typing.List[typing.Tuple[typing.Dict[str, typing.Any], int, int]]:
+        completed_keys = self.completed_keys()
+        runs = []
+        for configuration, repeat in itertools.product(self.configurations, range(self.repeats)):
+            key = configuration_key(configuration, repeat)
+            if key not in completed_keys:
+                runs.append((configuration, repeat, zlib.crc32(key.encode()) ^ self.seed))
+        return runs
+
+    def run(self) -> typing.Iterator[typing.Dict[str, typing.Any]]:
+        """
+        yields the result row of each run as soon as it is written. if iteration stops early, runs that didn't start
+        are cancelled.
+        """
+        runs = self.pending_runs()
+        if not runs:
+            return
+        fieldnames = self.fieldnames()
+        new_file = not self.path.exists() or not self.path.stat().st_size
+        arguments = parallel.worker_arguments(self.solver, self.solver_arguments, **self.configurations[0])
+        with open(self.path, "a", newline="") as result_file, concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.max_workers, initializer=parallel.initialize_worker,
+                initargs=(self.solver_class, arguments)) as executor:
+            writer = csv.DictWriter(result_file, fieldnames=fieldnames)
+            if new_file:
+                writer.writeheader()
+            futures = {
+                executor.submit(run_configuration, configuration, seed): (configuration, repeat, seed)
+                for configuration, repeat, seed in runs
+            }
+            try:
+                for future in concurrent.futures.as_completed(futures):
+                    configuration, repeat, seed = futures[future]
+                    energy, elapsed_time, total_generated_solution = future.result()
+                    row = dict(configuration, repeat=repeat, seed=seed, energy=energy, elapsed_time=elapsed_time,
+                               total_generated_solution=total_generated_solution)
+                    writer.writerow({name: str(value) for name, value in row.items()})
+                    result_file.flush()
+                    yield row
+            finally:
+                executor.shutdown(cancel_futures=True)
+
+    def to_parquet(self,
+                   path,  # type: typing.Union[str, pathlib.Path]
+                   ):
+        """
+        requires pandas with a parquet engine, e.g. pyarrow, they are not in requirements.txt.
+        """
+        if pandas is None:
+            raise ImportError("pandas is needed to write parquet files, install pandas and pyarrow")
+        pandas.read_csv(self.path).to_parquet(path)
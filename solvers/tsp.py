@@ -1,43 +1,166 @@
-import copy
+import bisect
 import itertools
-import math
+import os
 import random
 import typing
+from collections import OrderedDict
+from enum import Enum
 from functools import cached_property
 
 import geopy.distance as geopy_distance
+import numpy as np
 
 from algorithm.annealing import SMA, Solution
 from algorithm.cooling_schedule import CoolingScheduleType
+from algorithm.epoch_length import EpochLength, EpochLengthType
+from solvers import cache, distance, kernel
+
+
+OR_OPT_SEGMENT = 3  # maximum length of segments that are relocated by or-opt moves
+KERNEL_BLOCK_SIZE = 2 ** 16  # number of random numbers of each kernel call
+SYMMETRY_BLOCK_ROWS = 256  # rows of distance matrix that are compared with their transpose at once
+
+
+class MoveType(Enum):
+    SWAP = 1  # swaps plan[index_1] and plan[index_2]
+    TWO_OPT = 2  # reverses plan[index_1:index_2 + 1]
+    OR_OPT = 3  # moves plan[index_1:index_2 + 1], up to OR_OPT_SEGMENT locations, after plan[index_3]
+    INSERTION = 4  # moves plan[index_1] after plan[index_3], index_1 == index_2
 
 
 class TSPSolver(SMA):
     def __init__(self,
-                 data,  # type: typing.Dict[typing.Any, typing.Tuple[float, float]]
-                 distance_matrix_result=None,  # type: typing.Dict[str, typing.Dict[str, float]]
+                 data,  # type: typing.Union[typing.Dict[typing.Any, typing.Tuple[float, float]], np.ndarray]
+                 distance_matrix_result=None,  # type: typing.Union[typing.Dict[str, dict], list, str]
                  cooling_schedule_type=CoolingScheduleType.GEOMETRIC.value,
                  random_solutions=True,  # type: bool
-                 distance_calculator=geopy_distance.geodesic,  # type: typing.Type
+                 distance_calculator=geopy_distance.geodesic,  # type: typing.Callable
+                 initial_solution=None,  # type: Solution
+                 distance_matrix_cache=None,  # type: cache.DistanceMatrixCache
+                 move_probabilities=None,  # type: typing.Optional[typing.Dict[MoveType, float]]
+                 candidate_neighbours=0,  # type: int
+                 use_kernel=False,  # type: bool
                  *args, **kwargs):
+        """
+        locations are mapped to contiguous integer ids in data order, plans are lists of these ids and distances are
+        kept in a float64 numpy array. solve() returns the plan with location keys.
+        :param data: locations and their coordinates, or an (n, 2) coordinate array whose row indexes are locations.
+        :param distance_matrix_result: dict of dicts with location keys, 2d array or path of a .npy file that will be
+        memory mapped.
+        :param distance_matrix_cache: if given, distance matrix is loaded from or saved to the cache.
+        :param move_probabilities: weight of each move type in random neighbour generation, only swap moves by
+        default. neighbour generation without random_solutions iterates all index pairs for each move type.
+        :param candidate_neighbours: if given, random moves connect a location with one of its candidate_neighbours
+        nearest locations.
+        :param use_kernel: solve runs in solvers.kernel, compiled with numba if it is installed. it supports random
+        moves without candidate lists, fixed steps and logarithmic, geometric and exponential cooling. compiled and
+        python kernels give the same result for a seed, but the kernel draws moves from blocks of self.generator
+        instead of self.random, so its result differs from solve without the kernel.
+        """
         self.distance_matrix_result = distance_matrix_result
+        self.distance_matrix_cache = distance_matrix_cache
         self.distance_calculator = distance_calculator
         self.total_generated_solution = 0  # type: int
-        super(TSPSolver, self).__init__(data, cooling_schedule_type=cooling_schedule_type, *args, **kwargs)
+        self.candidate_neighbours = candidate_neighbours
+        self.positions = None  # type: typing.Optional[typing.List[int]]
+        self.random_solutions = random_solutions
+        self.use_kernel = use_kernel
+        self.plan_arrays = None  # type: typing.Optional[typing.Tuple[Solution, np.ndarray, np.ndarray]]
+        move_probabilities = move_probabilities or {MoveType.SWAP: 1}
+        self.move_types = [move_type for move_type, weight in move_probabilities.items() if weight > 0]
+        self.move_type_weights = list(itertools.accumulate(move_probabilities[move_type]
+                                                           for move_type in self.move_types))
+        self.MoveVariationChoices = OrderedDict(
+            [
+                (MoveType.SWAP.value, self.swap_variation),
+                (MoveType.TWO_OPT.value, self.two_opt_variation),
+                (MoveType.OR_OPT.value, self.relocation_variation),
+                (MoveType.INSERTION.value, self.relocation_variation),
+            ]
+        )
+        if candidate_neighbours and kwargs.get("batch_size"):
+            raise ValueError("batch proposals are drawn without candidate lists, set candidate_neighbours or "
+                             "batch_size")
+        self.locations = list(data.keys()) if isinstance(data, dict) else list(range(len(data)))
+        if initial_solution:
+            initial_solution = Solution(plan=self.encode_plan(initial_solution.plan), energy=initial_solution.energy)
+        super(TSPSolver, self).__init__(data, cooling_schedule_type=cooling_schedule_type,
+                                        initial_solution=initial_solution, *args, **kwargs)
         if not self.steps:
             self.count_steps()
-        self.neighbour_solution_generator = self.generate_random_neighbour_solution() if random_solutions \
-            else self.generate_neighbour_solution()
-        self.previous_swap = (0, 0)  # type: typing.Tuple[int, int]
+        self.neighbour_move_generator = self.generate_random_neighbour_move() if random_solutions \
+            else self.generate_neighbour_move()
 
     def stopping_criteria(self) -> bool:
         return self.temperature < self.temperature_min
 
     @cached_property
-    def distance_matrix(self) -> typing.Dict[str, typing.Dict[str, float]]:
-        return self.distance_matrix_result if self.distance_matrix_result else {
-            location[0]: {location_inner[0]: self.distance_calculator(location[1], location_inner[1]) for location_inner
-                          in self.data.items()}
-            for location in self.data.items()}
+    def location_indexes(self) -> typing.Dict[typing.Any, int]:
+        return {location: index for index, location in enumerate(self.locations)}
+
+    def encode_plan(self, plan) -> typing.List[int]:
+        return [self.location_indexes[location] for location in plan]
+
+    def decode_plan(self, plan) -> typing.List[typing.Any]:
+        return [self.locations[index] for index in plan]
+
+    @cached_property
+    def coordinates(self) -> np.ndarray:
+        if not isinstance(self.data, dict):
+            return np.asarray(self.data, dtype=np.float64)
+        return np.array([self.data[location] for location in self.locations], dtype=np.float64)
+
+    @cached_property
+    def distance_matrix(self) -> np.ndarray:
+        if self.distance_matrix_result is None:
+            if self.distance_matrix_cache is not None:
+                return self.distance_matrix_cache.distance_matrix(self.coordinates, self.distance_calculator)
+            return distance.distance_matrix(self.coordinates, self.distance_calculator)
+        if isinstance(self.distance_matrix_result, (str, os.PathLike)):
+            return np.load(self.distance_matrix_result, mmap_mode="r")
+        if isinstance(self.distance_matrix_result, dict):
+            return np.array([[self.distance_matrix_result[location][location_inner]
+                              for location_inner in self.locations] for location in self.locations], dtype=np.float64)
+        return np.asarray(self.distance_matrix_result, dtype=np.float64)
+
+    def instance_arguments(self) -> typing.Dict[str, typing.Any]:
+        """
+        arguments that rebuild this instance in another process without calculating distances again. memory mapped
+        matrices are passed with their file path.
+        """
+        distance_matrix = self.distance_matrix
+        if isinstance(distance_matrix, np.memmap) and distance_matrix.filename:
+            distance_matrix = distance_matrix.filename
+        return dict(data=self.data, distance_matrix_result=distance_matrix)
+
+    @cached_property
+    def distance_rows(self) -> typing.List[memoryview]:
+        """
+        rows of distance_matrix as memoryviews, indexing them is faster than indexing numpy array with scalars.
+        """
+        return [memoryview(row) for row in self.distance_matrix]
+
+    @cached_property
+    def candidate_lists(self) -> typing.List[typing.List[int]]:
+        """
+        candidate_neighbours nearest locations of each location.
+        """
+        distance_calculator = None if self.distance_matrix_result is not None else self.distance_calculator
+        return distance.nearest_neighbours(
+            self.coordinates, self.distance_matrix, min(self.candidate_neighbours, self.number_of_point - 1),
+            distance_calculator=distance_calculator).tolist()
+
+    @cached_property
+    def symmetric_distance(self) -> bool:
+        """
+        matrices of symmetric distance calculators are mirrored when they are built. other matrices are compared with
+        their transpose in blocks of rows, so large matrices are not copied.
+        """
+        if self.distance_matrix_result is None and distance.symmetric_calculator(self.distance_calculator):
+            return True
+        matrix, rows = self.distance_matrix, SYMMETRY_BLOCK_ROWS
+        return all(np.allclose(matrix[start:start + rows], matrix[:, start:start + rows].T)
+                   for start in range(0, len(matrix), rows))
 
     @cached_property
     def number_of_point(self) -> int:
@@ -45,11 +168,10 @@ class TSPSolver(SMA):
 
     def count_steps(self):
         """
-        (n!/(n-k)!)/k! counts neighbour solutions, with data length choose 2
+        steps of a linear epoch length, 100 * n but at most the n(n-1) ordered index pairs, so large instances get
+        steps in linear time and memory.
         """
-        number_of_combinations = math.factorial(self.number_of_point) // math.factorial(2) // math.factorial(
-            self.number_of_point - 2)
-        self.steps = number_of_combinations * 2
+        self.steps = EpochLength(EpochLengthType.LINEAR).steps(solver=self)
 
     @staticmethod
     def swap_index(
@@ -59,52 +181,321 @@ class TSPSolver(SMA):
     ):
         given_list[index_1], given_list[index_2] = given_list[index_2], given_list[index_1]
 
-    def generate_neighbour_solution(self):
-        index_combinations = itertools.combinations(range(self.number_of_point), 2)
-        indexes = (0, 0)
-        while indexes:
-            indexes = next(index_combinations, None)
-            if indexes:
-                plan = copy.copy(self.solution.plan)
-                self.swap_index(plan, *indexes)
-                yield Solution(plan=plan)
-        self.neighbour_solution_generator = self.generate_neighbour_solution()
-        yield next(self.neighbour_solution_generator)
-
-    def generate_random_neighbour_solution(self):
+    @staticmethod
+    def reverse_index(
+            given_list,  # type: list
+            index_1,  # type: int
+            index_2  # type: int
+    ):
+        given_list[index_1:index_2 + 1] = given_list[index_2:index_1 - 1 if index_1 else None:-1]
+
+    @staticmethod
+    def relocate_index(
+            given_list,  # type: list
+            index_1,  # type: int
+            index_2,  # type: int
+            index_3,  # type: int
+    ):
+        """
+        moves given_list[index_1:index_2 + 1] between given_list[index_3] and given_list[index_3 + 1].
+        """
+        segment = given_list[index_1:index_2 + 1]
+        del given_list[index_1:index_2 + 1]
+        index_3 = index_3 - len(segment) + 1 if index_3 > index_2 else index_3 + 1
+        given_list[index_3:index_3] = segment
+
+    def index_move(
+            self,
+            move_type,  # type: MoveType
+            index_1,  # type: int
+            index_2,  # type: int
+    ) -> typing.Optional[typing.Tuple[int, int, int, int]]:
+        """
+        :return move: move of move_type that is described by two plan indexes, index_1 < index_2. segments of or-opt
+        moves start at index_1, relocated segments are placed after index_2.
+        """
+        if move_type == MoveType.SWAP or move_type == MoveType.TWO_OPT:
+            return move_type.value, index_1, index_2, -1
+        segment_end = index_1 if move_type == MoveType.INSERTION else \
+            index_1 + max(1, min(OR_OPT_SEGMENT, self.number_of_point - 3)) - 1
+        if index_2 <= segment_end or (index_1 == 0 and index_2 == self.number_of_point - 1):
+            return None
+        return move_type.value, index_1, segment_end, index_2
+
+    def generate_neighbour_move(self):
+        while True:
+            for index_1, index_2 in itertools.combinations(range(self.number_of_point), 2):
+                for move_type in self.move_types:
+                    move = self.index_move(move_type, index_1, index_2)
+                    if move:
+                        yield move
+
+    def random_move_type(self,
+                         random_generator=None,  # type: typing.Optional[random.Random]
+                         ) -> MoveType:
+        if len(self.move_types) == 1:
+            return self.move_types[0]
+        random_generator = random_generator or self.random
+        return self.move_types[bisect.bisect(self.move_type_weights,
+                                             random_generator.random() * self.move_type_weights[-1])]
+
+    def random_move(
+            self,
+            move_type,  # type: MoveType
+            random_generator=None,  # type: typing.Optional[random.Random]
+    ) -> typing.Tuple[int, int, int, int]:
+        """
+        :param random_generator: self.random if not given
+        """
+        random_generator = random_generator or self.random
+        if move_type == MoveType.SWAP:
+            random_index_1, random_index_2 = random_generator.sample(range(self.number_of_point), 2)
+            return move_type.value, random_index_1, random_index_2, -1
+        if move_type == MoveType.TWO_OPT:
+            random_index_1, random_index_2 = sorted(random_generator.sample(range(self.number_of_point), 2))
+            return move_type.value, random_index_1, random_index_2, -1
+        length = 1 if move_type == MoveType.INSERTION else \
+            random_generator.randint(1, min(OR_OPT_SEGMENT, self.number_of_point - 2))
+        random_index_1 = random_generator.randrange(self.number_of_point - length + 1)
+        random_index_2 = random_index_1 + length - 1
+        random_index_3 = (random_index_2 + 1 + random_generator.randrange(self.number_of_point - length - 1)) % \
+            self.number_of_point
+        return move_type.value, random_index_1, random_index_2, random_index_3
+
+    def sample_move(
+            self,
+            random_generator,  # type: random.Random
+            *args, **kwargs
+    ) -> typing.Tuple[int, int, int, int]:
+        return self.random_move(self.random_move_type(random_generator), random_generator)
+
+    def candidate_move(
+            self,
+            move_type,  # type: MoveType
+    ) -> typing.Optional[typing.Tuple[int, int, int, int]]:
+        """
+        chooses a random location and one of its nearest neighbours, the move places them next to each other.
+        :return move: None if the move isn't valid for the chosen locations or the locations are already next to each
+        other. a move that doesn't change the tour would be accepted and end the temperature.
+        """
+        location = self.random.randrange(self.number_of_point)
+        index_1 = self.positions[location]
+        index_2 = self.positions[self.random.choice(self.candidate_lists[location])]
+        if abs(index_1 - index_2) in (1, self.number_of_point - 1):
+            return None
+        if move_type == MoveType.TWO_OPT:
+            return (move_type.value, index_1 + 1, index_2, -1) if index_1 < index_2 else \
+                (move_type.value, index_2 + 1, index_1, -1)
+        if move_type == MoveType.SWAP:
+            index_1 = (index_1 + 1) % self.number_of_point
+            return (move_type.value, index_1, index_2, -1) if index_1 != index_2 else None
+        length = 1 if move_type == MoveType.INSERTION else \
+            self.random.randint(1, min(OR_OPT_SEGMENT, self.number_of_point - 2))
+        segment_end = index_2 + length - 1
+        if segment_end >= self.number_of_point or index_2 - 1 <= index_1 <= segment_end or \
+                (index_2 == 0 and index_1 == self.number_of_point - 1):
+            return None
+        return move_type.value, index_2, segment_end, index_1
+
+    def generate_random_neighbour_move(self):
         while True:
-            random_index_1, random_index_2 = random.sample(range(self.number_of_point), 2)
-            new_plan = copy.deepcopy(self.solution.plan)
-            self.swap_index(new_plan, random_index_1, random_index_2)
-            self.total_generated_solution += 1
-            yield Solution(plan=new_plan)
+            move_type = self.random_move_type()
+            move = self.candidate_move(move_type) if self.candidate_neighbours else None
+            if move is None:
+                move = self.random_move(move_type)
+            yield move
+
+    def generate_move(
+            self,
+            *args, **kwargs
+    ) -> typing.Tuple[int, int, int, int]:
+        """
+        :return move: (move type, index_1, index_2, index_3), the plan itself is not copied until the move is
+        accepted.
+        """
+        move = next(self.neighbour_move_generator)
+        self.total_generated_solution += 1
+        return move
+
+    def generate_move_batch(
+            self,
+            size,  # type: int
+            *args, **kwargs
+    ) -> typing.Optional[np.ndarray]:
+        """
+        random moves of the move types drawn from self.generator. candidate lists are not used, solvers with
+        candidate_neighbours can't have a batch_size. a batch evaluates moves that come after the accepted one too,
+        it is faster than single moves when few moves are accepted: on 1000 random points, 2-opt and or-opt moves
+        at about 1% acceptance ran 1.7 to 1.9 times as many proposals per second with batch_size 256, at 3%
+        acceptance single moves were faster.
+        """
+        if not self.random_solutions:
+            return None
+        moves = np.full((size, 4), -1, dtype=np.int64)
+        if len(self.move_types) == 1:
+            moves[:, 0] = self.move_types[0].value
+        else:
+            move_type_values = np.array([move_type.value for move_type in self.move_types])
+            moves[:, 0] = move_type_values[np.searchsorted(
+                self.move_type_weights, self.generator.random(size) * self.move_type_weights[-1], side="right")]
+        index_1 = self.generator.integers(self.number_of_point, size=size)
+        index_2 = self.generator.integers(self.number_of_point - 1, size=size)
+        index_2 += index_2 >= index_1
+        two_opt = moves[:, 0] == MoveType.TWO_OPT.value
+        moves[:, 1] = np.where(two_opt, np.minimum(index_1, index_2), index_1)
+        moves[:, 2] = np.where(two_opt, np.maximum(index_1, index_2), index_2)
+        relocation = moves[:, 0] >= MoveType.OR_OPT.value
+        if relocation.any():
+            count = int(relocation.sum())
+            length = np.ones(count, dtype=np.int64)
+            or_opt = moves[relocation, 0] == MoveType.OR_OPT.value
+            length[or_opt] = self.generator.integers(
+                1, min(OR_OPT_SEGMENT, self.number_of_point - 2) + 1, size=int(or_opt.sum()))
+            segment_start = self.generator.integers(self.number_of_point - length + 1)
+            segment_end = segment_start + length - 1
+            moves[relocation, 1], moves[relocation, 2] = segment_start, segment_end
+            moves[relocation, 3] = (segment_end + 1 + self.generator.integers(self.number_of_point - length - 1)) % \
+                self.number_of_point
+        return moves
+
+    def thermal_equilibrium_batch(self, size) -> int:
+        """
+        only the moves up to the accepted one are counted as generated solutions.
+        """
+        steps = super(TSPSolver, self).thermal_equilibrium_batch(size=size)
+        if self.random_solutions:
+            self.total_generated_solution += steps
+        return steps
+
+    def apply_move(
+            self,
+            plan,  # type: list
+            move,  # type: typing.Tuple[int, int, int, int]
+    ):
+        move_type, index_1, index_2, index_3 = move
+        if move_type == MoveType.SWAP.value:
+            self.swap_index(plan, index_1, index_2)
+        elif move_type == MoveType.TWO_OPT.value:
+            self.reverse_index(plan, index_1, index_2)
+        else:
+            self.relocate_index(plan, index_1, index_2, index_3)
+
+    def add_solution(self,
+                     solution,  # type: Solution
+                     state=None,
+                     ) -> bool:
+        added = super(TSPSolver, self).add_solution(solution=solution, state=state)
+        if added and self.candidate_neighbours:
+            self.update_positions(move=solution.move)
+        return added
+
+    def update_positions(self,
+                         move=None,  # type: typing.Optional[typing.Tuple[int, int, int, int]]
+                         ):
+        """
+        positions[location] is the index of location in the current plan, only indexes changed by move are updated.
+        """
+        plan = self.solution.plan
+        if move is None or self.positions is None:
+            self.positions = [0] * self.number_of_point
+            changed_indexes = range(self.number_of_point)
+        else:
+            move_type, index_1, index_2, index_3 = move
+            if move_type == MoveType.SWAP.value:
+                changed_indexes = (index_1, index_2)
+            elif move_type == MoveType.TWO_OPT.value:
+                changed_indexes = range(index_1, index_2 + 1)
+            else:
+                changed_indexes = range(min(index_1, index_3 + 1), max(index_2, index_3) + 1)
+        for index in changed_indexes:
+            self.positions[plan[index]] = index
 
     def generate_solution(
             self,
             *args, **kwargs
     ):
-        new_solution = next(self.neighbour_solution_generator)
-        self.total_generated_solution += 1
-        return new_solution
+        return self.move_solution(move=self.generate_move())
 
     def generate_initial_solution(
             self,
             *args, **kwargs
     ) -> Solution:
-        data_key_list = [i for i in self.data.keys()]
-        random.shuffle(data_key_list)
-        return Solution(plan=data_key_list)
+        plan = list(range(self.number_of_point))
+        self.random.shuffle(plan)
+        return Solution(plan=plan)
 
     def iterate_coords(self, plan):
         a, total_distance = 0, 0
         while self.number_of_point > a:
             location_0 = plan[a - 1]
             location_1 = plan[a]
-            distance = self.distance_matrix[location_0][location_1]
+            distance = self.distance_rows[location_0][location_1]
             total_distance += distance
             yield total_distance
             a = a + 1
 
+    def solve(self) -> typing.List[typing.Any]:
+        if self.use_kernel:
+            self.kernel_solve()
+            if self.polish_steps:
+                self.polish()
+            return self.best_plan()
+        return self.decode_plan(super(TSPSolver, self).solve())
+
+    def best_plan(self) -> typing.List[typing.Any]:
+        """
+        best plan so far with location keys, it can be called from a callback or between iter_solve steps.
+        """
+        return self.decode_plan(self.best_solution.plan)
+
+    def kernel_solve(self) -> typing.List[int]:
+        """
+        runs kernel.anneal with blocks of random numbers from self.generator until it stops, the last plan becomes
+        the current solution and its energy is recalculated. best plan of the kernel becomes the best solution.
+        moves and acceptance thresholds are drawn from the same blocks by the compiled and the python kernel, so
+        both give the same result for a seed. solve without the kernel draws moves from self.random one by one, its
+        result for the same seed is different.
+        """
+        if not self.random_solutions or self.candidate_neighbours or self.epoch_length is not None or \
+                self.statistics is not None or self.history is not None or self.trace is not None or \
+                self.metrics is not None or self.verify_energy or self.old_states or self.old_solutions or \
+                self.batch_size or self.time_budget or self.evaluation_budget or self.callback is not None or \
+                self.cooling_schedule_type not in kernel.KERNEL_COOLING_SCHEDULES:
+            raise ValueError("kernel supports random moves without candidate lists, fixed steps, logarithmic, "
+                             "geometric and exponential cooling, without statistics, history, trace, metrics, "
+                             "energy verification, old states and solutions, batches and budgets")
+        if self.temperature_estimation is not None and None in (self.initial_temperature, self.temperature_min):
+            self.estimate_temperatures()
+        plan = np.array(self.solution.plan, dtype=np.int64)
+        matrix = np.asarray(self.distance_matrix, dtype=np.float64)
+        move_types = np.array([move_type.value for move_type in self.move_types], dtype=np.int64)
+        move_type_weights = np.array(self.move_type_weights, dtype=np.float64)
+        best_solution = self.best_solution
+        best_plan = np.array(best_solution.plan, dtype=np.int64)
+        journal = np.empty((self.number_of_point, 4), dtype=np.int64)
+        counters = np.zeros(9, dtype=np.int64)
+        counters[kernel.K], counters[kernel.STOPPED] = self.k, self.stopping_criteria()
+        counters[kernel.JOURNAL_LENGTH] = 0 if np.array_equal(best_plan, plan) else -1
+        values = np.array([self.temperature, self.energy, self.initial_temperature, self.temperature_min,
+                           self.cooling_speed, self.n, best_solution.energy], dtype=np.float64)
+        while not counters[kernel.STOPPED]:
+            counters[kernel.UNIFORM_INDEX], counters[kernel.THRESHOLD_INDEX] = 0, 0
+            kernel.anneal(plan, matrix, self.symmetric_distance, move_types, move_type_weights, OR_OPT_SEGMENT,
+                          self.generator.random(KERNEL_BLOCK_SIZE),
+                          self.generator.standard_exponential(KERNEL_BLOCK_SIZE), counters, values,
+                          self.cooling_schedule_type.value, self.steps, best_plan, journal)
+        if counters[kernel.JOURNAL_LENGTH] > 0:
+            kernel.synchronize(best_plan, journal, counters)
+        self.k = int(counters[kernel.K])
+        self.total_generated_solution += int(counters[kernel.GENERATED])
+        self.evaluations += int(counters[kernel.GENERATED])
+        self.restart(solution=Solution(plan=plan.tolist()), temperature=float(values[kernel.TEMPERATURE]))
+        best_solution = Solution(plan=best_plan.tolist())
+        best_solution.calculate_energy(solver=self)
+        if best_solution.energy < self.best.energy:
+            self.best.reset(plan=best_solution.plan, energy=best_solution.energy)
+        return self.solution.plan
+
     def objective_function(
             self,
             solution,  # type: Solution
@@ -123,3 +514,130 @@ class TSPSolver(SMA):
         """
         *_, total_distance = self.iterate_coords(plan=solution.plan)
         return total_distance
+
+    def swapped_edges(self, index_1, index_2):
+        """
+        swapping two locations only changes the edges that end at or start from them, edge a is plan[a-1]->plan[a].
+        """
+        return {index_1, index_2, (index_1 + 1) % self.number_of_point, (index_2 + 1) % self.number_of_point}
+
+    def objective_function_variation(
+            self,
+            move,  # type: typing.Tuple[int, int, int, int]
+            *args, **kwargs
+    ) -> float:
+        """
+        energy variation of a move, calculated with the changed edges instead of the whole plan.
+        """
+        return self.MoveVariationChoices[move[0]](*move[1:])
+
+    def current_plan_arrays(self) -> typing.Tuple[np.ndarray, typing.Optional[np.ndarray]]:
+        """
+        current plan as an array and prefix sums of reversed minus forward edge distances for asymmetric 2-opt,
+        rebuilt only when the current solution changes.
+        """
+        if self.plan_arrays is None or self.plan_arrays[0] is not self.solution:
+            plan = np.array(self.solution.plan, dtype=np.int64)
+            reversal_prefix = None
+            if not self.symmetric_distance:
+                reversal_prefix = np.concatenate([[0.0], np.cumsum(
+                    self.distance_matrix[plan[1:], plan[:-1]] - self.distance_matrix[plan[:-1], plan[1:]])])
+            self.plan_arrays = (self.solution, plan, reversal_prefix)
+        return self.plan_arrays[1], self.plan_arrays[2]
+
+    def objective_function_variations(
+            self,
+            moves,  # type: np.ndarray
+            *args, **kwargs
+    ) -> np.ndarray:
+        """
+        energy variations of a move batch with gathers on the distance matrix, same formulas as the single moves.
+        """
+        plan, reversal_prefix = self.current_plan_arrays()
+        matrix, number_of_point = self.distance_matrix, self.number_of_point
+        energy_variations = np.zeros(len(moves))
+        move_type, index_1, index_2, index_3 = moves.T
+        swap = move_type == MoveType.SWAP.value
+        if swap.any():
+            swap_1, swap_2 = index_1[swap], index_2[swap]
+
+            def swapped_location(index):
+                return np.where(index == swap_1, plan[swap_2], np.where(index == swap_2, plan[swap_1], plan[index]))
+
+            variation = np.zeros(len(swap_1))
+            # edges of swapped_edges, edge a is plan[a-1]->plan[a], shared edges of neighbour indexes counted once
+            for edge, duplicate in ((swap_1, None), ((swap_1 + 1) % number_of_point, swap_2), (swap_2, None),
+                                    ((swap_2 + 1) % number_of_point, swap_1)):
+                previous = (edge - 1) % number_of_point
+                edge_variation = matrix[swapped_location(previous), swapped_location(edge)] - \
+                    matrix[plan[previous], plan[edge]]
+                if duplicate is not None:
+                    edge_variation[edge == duplicate] = 0
+                variation += edge_variation
+            energy_variations[swap] = variation
+        two_opt = move_type == MoveType.TWO_OPT.value
+        if two_opt.any():
+            start, end = index_1[two_opt], index_2[two_opt]
+            a, b, c, d = plan[start - 1], plan[start], plan[end], plan[(end + 1) % number_of_point]
+            length = end - start + 1
+            variation = np.where(length == number_of_point, matrix[b, c] - matrix[c, b],
+                                 matrix[a, c] + matrix[b, d] - matrix[a, b] - matrix[c, d])
+            if self.symmetric_distance:
+                variation[length + 1 >= number_of_point] = 0
+            else:
+                variation += reversal_prefix[end] - reversal_prefix[start]
+            energy_variations[two_opt] = variation
+        relocation = move_type >= MoveType.OR_OPT.value
+        if relocation.any():
+            start, end, target = index_1[relocation], index_2[relocation], index_3[relocation]
+            segment_start, segment_end = plan[start], plan[end]
+            previous, following = plan[start - 1], plan[(end + 1) % number_of_point]
+            target_location, target_next = plan[target], plan[(target + 1) % number_of_point]
+            energy_variations[relocation] = matrix[previous, following] + matrix[target_location, segment_start] + \
+                matrix[segment_end, target_next] - matrix[previous, segment_start] - \
+                matrix[segment_end, following] - matrix[target_location, target_next]
+        return energy_variations
+
+    def swap_variation(self, index_1, index_2, *args) -> float:
+        plan = self.solution.plan
+        swapped = {index_1: plan[index_2], index_2: plan[index_1]}
+        energy_variation = 0
+        for a in self.swapped_edges(index_1, index_2):
+            previous = (a - 1) % self.number_of_point
+            energy_variation += \
+                self.distance_rows[swapped.get(previous, plan[previous])][swapped.get(a, plan[a])] - \
+                self.distance_rows[plan[previous]][plan[a]]
+        return energy_variation
+
+    def two_opt_variation(self, index_1, index_2, *args) -> float:
+        """
+        reversing plan[index_1:index_2 + 1] replaces edges a->b and c->d with a->c and b->d. if distances are not
+        symmetric, edges inside the segment change direction too.
+        """
+        plan, distance_rows = self.solution.plan, self.distance_rows
+        if index_2 - index_1 + 2 >= self.number_of_point and self.symmetric_distance:
+            return 0
+        b, c = plan[index_1], plan[index_2]
+        if index_2 - index_1 + 1 == self.number_of_point:
+            energy_variation = distance_rows[b][c] - distance_rows[c][b]
+        else:
+            a, d = plan[index_1 - 1], plan[(index_2 + 1) % self.number_of_point]
+            energy_variation = distance_rows[a][c] + distance_rows[b][d] - distance_rows[a][b] - distance_rows[c][d]
+        if not self.symmetric_distance:
+            for index in range(index_1, index_2):
+                energy_variation += distance_rows[plan[index + 1]][plan[index]] - \
+                                    distance_rows[plan[index]][plan[index + 1]]
+        return energy_variation
+
+    def relocation_variation(self, index_1, index_2, index_3) -> float:
+        """
+        moving plan[index_1:index_2 + 1] after plan[index_3] joins its previous and next locations and inserts it
+        between plan[index_3] and the location after it, segment keeps its direction.
+        """
+        plan, distance_rows = self.solution.plan, self.distance_rows
+        segment_start, segment_end = plan[index_1], plan[index_2]
+        previous, following = plan[index_1 - 1], plan[(index_2 + 1) % self.number_of_point]
+        target, target_next = plan[index_3], plan[(index_3 + 1) % self.number_of_point]
+        return distance_rows[previous][following] + distance_rows[target][segment_start] + \
+            distance_rows[segment_end][target_next] - distance_rows[previous][segment_start] - \
+            distance_rows[segment_end][following] - distance_rows[target][target_next]
@@ -0,0 +1,270 @@
+"""
+benchmark of TSPSolver on the bundled locations and random instances. each run reports Metropolis steps per second,
+full and delta energy evaluations per second counted by Metrics, time to reach the target energy and gap of the best
+energy to a reference tour. the reference is solved with ortools if it is installed, it is a nearest neighbour tour
+otherwise. bundled locations are latitude and longitude pairs with haversine distances, random instances are points
+of a plane with euclidean distances.
+
+results are written to a json file, when a baseline file is given, runs whose throughput or gap got worse than the
+tolerance are reported and the script exits with status 1:
+    python -m tests.benchmark --output tests/benchmark.json
+    python -m tests.benchmark --output new.json --baseline tests/benchmark.json
+"""
+import argparse
+import json
+import os
+import pathlib
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import typing
+
+import numpy as np
+
+from algorithm import settings
+from algorithm.annealing import Solution
+from algorithm.cooling_schedule import CoolingScheduleType
+from algorithm.metrics import Metrics
+from data import example_data
+from solvers.distance import DistanceCalculatorType
+from solvers.tsp import MoveType, TSPSolver
+
+try:
+    from ortools.constraint_solver import pywrapcp, routing_enums_pb2
+except ImportError:
+    pywrapcp, routing_enums_pb2 = None, None
+
+# 10000 points need an 800 MB distance matrix, they are run with --sizes 100 1000 10000
+RANDOM_SIZES = (100, 1000)
+ORTOOLS_DISTANCE_SCALE = 1000  # ortools distances are integers, distances are multiplied before rounding
+# solver arguments of each variant, added to BENCHMARK_ARGUMENTS
+VARIANTS = {
+    "sequential": {},
+    "batch": {"batch_size": 256},
+}
+BENCHMARK_ARGUMENTS = dict(
+    initial_temperature=None,
+    temperature_min=None,
+    temperature_estimation=settings.TemperatureEstimation(),
+    cooling_speed=0.99,
+    cooling_schedule_type=CoolingScheduleType.GEOMETRIC,
+    move_probabilities={MoveType.TWO_OPT: 0.7, MoveType.OR_OPT: 0.3},
+)
+
+
+def instances(
+        sizes=RANDOM_SIZES,  # type: typing.Sequence[int]
+        seed=0,  # type: int
+) -> typing.Dict[str, typing.Union[dict, np.ndarray]]:
+    """
+    bundled locations and uniform random points in a 1000 x 1000 square.
+    """
+    bundled = {"LOCATIONS_%d" % len(locations): locations for locations in (
+        example_data.LOCATIONS_22, example_data.LOCATIONS_40, example_data.LOCATIONS_50, example_data.LOCATIONS_58)}
+    generator = np.random.default_rng(seed)
+    return dict(bundled, **{"random_%d" % size: generator.random((size, 2)) * 1000 for size in sizes})
+
+
+def distance_calculator(
+        data,  # type: typing.Union[dict, np.ndarray]
+) -> DistanceCalculatorType:
+    return DistanceCalculatorType.EUCLIDEAN if isinstance(data, np.ndarray) else DistanceCalculatorType.HAVERSINE
+
+
+def nearest_neighbour_plan(
+        matrix,  # type: np.ndarray
+) -> typing.List[int]:
+    visited = np.zeros(len(matrix), dtype=bool)
+    plan = [0]
+    visited[0] = True
+    for _ in range(len(matrix) - 1):
+        distances = np.where(visited, np.inf, matrix[plan[-1]])
+        plan.append(int(distances.argmin()))
+        visited[plan[-1]] = True
+    return plan
+
+
+def ortools_plan(
+        matrix,  # type: np.ndarray
+        time_limit,  # type: int
+) -> typing.List[int]:
+    """
+    guided local search from the cheapest arc tour.
+    """
+    distances = np.rint(matrix * ORTOOLS_DISTANCE_SCALE).astype(np.int64).tolist()
+    manager = pywrapcp.RoutingIndexManager(len(matrix), 1, 0)
+    routing = pywrapcp.RoutingModel(manager)
+    transit = routing.RegisterTransitCallback(
+        lambda index, index_inner: distances[manager.IndexToNode(index)][manager.IndexToNode(index_inner)])
+    routing.SetArcCostEvaluatorOfAllVehicles(transit)
+    parameters = pywrapcp.DefaultRoutingSearchParameters()
+    parameters.first_solution_strategy = routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC
+    parameters.local_search_metaheuristic = routing_enums_pb2.LocalSearchMetaheuristic.GUIDED_LOCAL_SEARCH
+    parameters.time_limit.seconds = time_limit
+    solution = routing.SolveWithParameters(parameters)
+    plan, index = [], routing.Start(0)
+    while not routing.IsEnd(index):
+        plan.append(manager.IndexToNode(index))
+        index = solution.Value(routing.NextVar(index))
+    return plan
+
+
+def reference(
+        solver,  # type: TSPSolver
+        time_limit=10,  # type: int
+        ortools_max_size=1000,  # type: int
+) -> typing.Tuple[str, float]:
+    """
+    :return reference: name of the reference solver and energy of its plan
+    """
+    matrix = np.asarray(solver.distance_matrix)
+    if pywrapcp is not None and len(matrix) <= ortools_max_size:
+        name, plan = "ortools", ortools_plan(matrix, time_limit=time_limit)
+    else:
+        name, plan = "nearest_neighbour", nearest_neighbour_plan(matrix)
+    return name, solver.objective_function(Solution(plan=plan))
+
+
+def run(
+        data,  # type: typing.Union[dict, np.ndarray]
+        seed,  # type: int
+        evaluation_budget,  # type: int
+        target_energy,  # type: float
+        distance_matrix,  # type: np.ndarray
+        **solver_arguments
+) -> typing.Dict[str, typing.Any]:
+    """
+    time to target is measured after each temperature, it is None if the target isn't reached.
+    """
+    target_times, records = [], []
+
+    def callback(progress):
+        if not target_times and progress.best_energy <= target_energy:
+            target_times.append(progress.elapsed_time)
+
+    solver = TSPSolver(data=data, distance_matrix_result=distance_matrix, steps=10 * len(data), seed=seed,
+                       evaluation_budget=evaluation_budget, callback=callback,
+                       metrics=Metrics(sinks=[records.append], levels=False),
+                       distance_calculator=distance_calculator(data), **dict(BENCHMARK_ARGUMENTS, **solver_arguments))
+    start_time = time.perf_counter()
+    solver.solve()
+    elapsed_time = time.perf_counter() - start_time
+    return dict(seed=seed, elapsed_time=elapsed_time, steps=solver.evaluations,
+                steps_per_second=solver.evaluations / elapsed_time,
+                evaluations_per_second=records[-1]["evaluations"] / elapsed_time,
+                time_to_target=target_times[0] if target_times else None, best_energy=solver.best.energy)
+
+
+def benchmark(
+        sizes=RANDOM_SIZES,  # type: typing.Sequence[int]
+        variants=tuple(VARIANTS),  # type: typing.Sequence[str]
+        repeats=3,  # type: int
+        steps_per_point=1000,  # type: int
+        target_gap=0.05,  # type: float
+        reference_time_limit=10,  # type: int
+) -> typing.List[typing.Dict[str, typing.Any]]:
+    """
+    :param steps_per_point: evaluation budget of a run is steps_per_point * number of locations
+    :param target_gap: target energy is reference energy * (1 + target_gap)
+    :return results: a result for each instance and variant with the median of the repeats
+    """
+    results = []
+    for name, data in instances(sizes=sizes).items():
+        solver = TSPSolver(data=data, initial_temperature=1, temperature_min=1, cooling_speed=1,
+                           distance_calculator=distance_calculator(data))
+        reference_name, reference_energy = reference(solver, time_limit=reference_time_limit)
+        for variant in variants:
+            runs = [run(data, seed=seed, evaluation_budget=steps_per_point * len(data),
+                        target_energy=reference_energy * (1 + target_gap), distance_matrix=solver.distance_matrix,
+                        **VARIANTS[variant]) for seed in range(repeats)]
+            target_times = [result["time_to_target"] for result in runs if result["time_to_target"] is not None]
+            best_energy = statistics.median(result["best_energy"] for result in runs)
+            result = dict(
+                instance=name, size=len(data), variant=variant, reference=reference_name,
+                reference_energy=reference_energy, best_energy=best_energy, gap=best_energy / reference_energy - 1,
+                time_to_target=statistics.median(target_times) if len(target_times) == len(runs) else None,
+                **{key: statistics.median(result[key] for result in runs)
+                   for key in ("elapsed_time", "steps_per_second", "evaluations_per_second")},
+                runs=runs)
+            results.append(result)
+            print("%(instance)s %(variant)s: %(steps_per_second).0f steps/s, %(evaluations_per_second).0f "
+                  "evaluations/s, gap %(gap).4f to %(reference)s, time to target %(time_to_target)s" % result)
+    return results
+
+
+def environment() -> typing.Dict[str, typing.Any]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                cwd=pathlib.Path(__file__).parent).stdout.strip() or None
+    except OSError:
+        commit = None
+    try:
+        import numba
+        numba_version = numba.__version__
+    except ImportError:
+        numba_version = None
+    return dict(commit=commit, python=platform.python_version(), numpy=np.__version__, numba=numba_version,
+                ortools=pywrapcp is not None, machine=platform.machine(), processor=platform.processor(),
+                cpu_count=os.cpu_count())
+
+
+def compare(
+        results,  # type: typing.List[typing.Dict[str, typing.Any]]
+        baseline,  # type: typing.List[typing.Dict[str, typing.Any]]
+        tolerance=0.1,  # type: float
+        gap_tolerance=0.01,  # type: float
+) -> typing.List[str]:
+    """
+    :param tolerance: allowed relative decrease of steps and evaluations per second
+    :param gap_tolerance: allowed increase of gap
+    :return regressions: a message for each regression
+    """
+    baseline_results = {(result["instance"], result["variant"]): result for result in baseline}
+    regressions = []
+    for result in results:
+        baseline_result = baseline_results.get((result["instance"], result["variant"]))
+        if baseline_result is None:
+            continue
+        for key in ("steps_per_second", "evaluations_per_second"):
+            ratio = result[key] / baseline_result[key]
+            if ratio < 1 - tolerance:
+                regressions.append("%s %s: %s is %.1f%% of baseline" % (
+                    result["instance"], result["variant"], key, 100 * ratio))
+        if baseline_result["reference"] == result["reference"] and \
+                result["gap"] > baseline_result["gap"] + gap_tolerance:
+            regressions.append("%s %s: gap %.4f, baseline %.4f" % (
+                result["instance"], result["variant"], result["gap"], baseline_result["gap"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", type=pathlib.Path, default=pathlib.Path(__file__).parent.joinpath(
+        "benchmark.json"))
+    parser.add_argument("--baseline", type=pathlib.Path)
+    parser.add_argument("--sizes", type=int, nargs="*", default=list(RANDOM_SIZES))
+    parser.add_argument("--variants", nargs="*", choices=list(VARIANTS), default=list(VARIANTS))
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--steps-per-point", type=int, default=1000)
+    parser.add_argument("--target-gap", type=float, default=0.05)
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    parser.add_argument("--gap-tolerance", type=float, default=0.01)
+    arguments = parser.parse_args()
+    results = benchmark(sizes=arguments.sizes, variants=arguments.variants, repeats=arguments.repeats,
+                        steps_per_point=arguments.steps_per_point, target_gap=arguments.target_gap)
+    with open(arguments.output, "w") as output_file:
+        json.dump(dict(environment=environment(), results=results), output_file, indent=2)
+    if arguments.baseline is not None:
+        with open(arguments.baseline) as baseline_file:
+            regressions = compare(results, json.load(baseline_file)["results"], tolerance=arguments.tolerance,
+                                  gap_tolerance=arguments.gap_tolerance)
+        for regression in regressions:
+            print(regression)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
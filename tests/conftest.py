@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+from data import example_data
+from solvers.distance import DistanceCalculatorType
+from solvers.tsp import TSPSolver
+
+
+def symmetric_solver(**kwargs):
+    return TSPSolver(**dict(dict(data=example_data.LOCATIONS_22, initial_temperature=1, temperature_min=1,
+                                 cooling_speed=1, distance_calculator=DistanceCalculatorType.HAVERSINE, seed=3),
+                            **kwargs))
+
+
+def asymmetric_solver(**kwargs):
+    matrix = np.random.default_rng(3).random((22, 22)) * 100
+    np.fill_diagonal(matrix, 0)
+    return TSPSolver(**dict(dict(data=dict.fromkeys(range(22)), distance_matrix_result=matrix, initial_temperature=1,
+                                 temperature_min=1, cooling_speed=1, seed=3), **kwargs))
+
+
+@pytest.fixture(params=[symmetric_solver, asymmetric_solver], ids=["symmetric", "asymmetric"])
+def make_solver(request):
+    """
+    solver factory of a symmetric haversine instance and of an asymmetric random matrix, kwargs override arguments.
+    """
+    return request.param
@@ -0,0 +1,98 @@
+"""
+drawing of routes, kept apart from the solvers so the plot process doesn't import them.
+"""
+import multiprocessing
+import os
+import queue
+import sys
+import time
+import typing
+
+import matplotlib
+import matplotlib.pyplot as plt
+import numpy as np
+
+NON_INTERACTIVE_BACKENDS = {"agg", "cairo", "pdf", "pgf", "ps", "svg", "template"}
+SAVED_FRAME_RATE = 1  # frames per second of the live plot with a non interactive backend, each frame is a savefig
+
+
+def plot_backend() -> str:
+    """
+    MPLBACKEND if it is set, Agg on linux without a display and TkAgg otherwise.
+    """
+    if os.environ.get("MPLBACKEND"):
+        return os.environ["MPLBACKEND"]
+    if sys.platform.startswith("linux") and not (os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY")):
+        return "Agg"
+    return "TkAgg"
+
+
+matplotlib.use(plot_backend())
+
+
+def route_axes(
+        coordinates,  # type: np.ndarray
+        title,  # type: str
+        animated=False,  # type: bool
+):
+    """
+    figure with an empty route line, axis limits are set once from the coordinates.
+    :param animated: route line and its label are left out of figure draws, they are drawn with blitting
+    """
+    figure, ax = plt.subplots(figsize=(17, 11))
+    line, = ax.plot([], [], "-o", markerfacecolor="r", markeredgecolor="r", animated=animated)
+    margin = 0.05 * (coordinates.max(axis=0) - coordinates.min(axis=0))
+    ax.set_xlim(coordinates[:, 0].min() - margin[0], coordinates[:, 0].max() + margin[0])
+    ax.set_ylim(coordinates[:, 1].min() - margin[1], coordinates[:, 1].max() + margin[1])
+    ax.set_title(title, color="b")
+    ax.set_xlabel('Latitude', color="r")
+    ax.set_ylabel('Longitude', color="r")
+    ax.grid()
+    label = ax.text(0.01, 0.99, "", transform=ax.transAxes, verticalalignment="top", animated=animated)
+    return figure, ax, line, label
+
+
+def render_live(
+        snapshots,  # type: multiprocessing.Queue
+        coordinates,  # type: np.ndarray
+        title,  # type: str
+        frame_rate,  # type: float
+        path=None,  # type: typing.Optional[str]
+):
+    """
+    runs in the plot process, draws the latest snapshot frame_rate times per second. only the route line and its
+    label are redrawn over the saved background, the figure isn't rebuilt. with a non interactive backend frames are
+    saved to path instead, at most SAVED_FRAME_RATE times per second.
+    """
+    interactive = matplotlib.get_backend().lower() not in NON_INTERACTIVE_BACKENDS
+    if not interactive:
+        frame_rate = min(frame_rate, SAVED_FRAME_RATE)
+    figure, ax, line, label = route_axes(coordinates, title, animated=interactive)
+    if interactive:
+        plt.show(block=False)
+        figure.canvas.draw()
+        background = figure.canvas.copy_from_bbox(figure.bbox)
+    while True:
+        frame_time = time.perf_counter()
+        try:
+            snapshot = snapshots.get(timeout=1 / frame_rate)
+        except queue.Empty:
+            if interactive:
+                figure.canvas.flush_events()
+            continue
+        if snapshot is None:
+            break
+        plan, temperature, energy = snapshot
+        route = coordinates[np.append(plan, plan[0])]
+        line.set_data(route[:, 0], route[:, 1])
+        label.set_text('Temperature: %.4f - Energy: %.2f' % (temperature, energy))
+        if interactive:
+            figure.canvas.restore_region(background)
+            ax.draw_artist(line)
+            ax.draw_artist(label)
+            figure.canvas.blit(figure.bbox)
+            figure.canvas.flush_events()
+        elif path is not None:
+            figure.savefig(path)
+        time.sleep(max(0.0, 1 / frame_rate - (time.perf_counter() - frame_time)))
+    plt.close(figure)
@@ -1,104 +1,117 @@
+import multiprocessing
 import pathlib
+import queue
 import time
+import typing
 
-import matplotlib
 import matplotlib.pyplot as plt
+import numpy as np
 
 from solvers import tsp
+from tests.live_plot import render_live, route_axes
 
-matplotlib.use("TkAgg")
+FRAMES_DIR = pathlib.Path(__file__).parent.absolute().joinpath("frames")
+STOP_TIMEOUT = 5  # seconds to wait for the plot process to draw the last snapshot and exit
 
 
 class PlotTSPSolver(tsp.TSPSolver):
-    def __init__(self, plot_coords=True, save_last_frame=True, *args, **kwargs):
-        if plot_coords:
-            plt.ion()
-        if save_last_frame and not plot_coords:
-            plt.ioff()
+    """
+    accepted solutions are drawn live by a separate process. the solver sends at most frame_rate snapshots per
+    second to a queue of one snapshot and drops a snapshot when the queue is full, so it never waits for the plot.
+    """
+
+    def __init__(self, plot_coords=True, save_last_frame=True, frame_rate=10, *args, **kwargs):
+        """
+        :param frame_rate: frames per second of the live plot
+        """
         self.plot_coords = plot_coords
         self.save_last_frame = save_last_frame
-        self.figure, self.ax, self.lines = None, None, None
+        self.frame_rate = frame_rate
+        self.snapshots = None  # type: typing.Optional[multiprocessing.Queue]
+        self.plot_process = None  # type: typing.Optional[multiprocessing.Process]
+        self.snapshot_time = 0.0  # type: float
         self.time = 0
         super(PlotTSPSolver, self).__init__(*args, **kwargs)
 
-    def start_plot(self):
-        if self.plot_coords or self.save_last_frame:
-            self.figure, self.ax = plt.subplots(figsize=(17, 11), )
-            self.lines, = self.ax.plot([], [])
-            self.ax.set_autoscaley_on(True)
-            self.ax.set_xlim(-500, 500)
-            self.ax.grid()
+    @property
+    def title(self) -> str:
+        return "%s Cooling Schedule \n initial temperature: %.2f, cooling_speed: %.2f, minimum temperature: %.2f" % (
+            self.cooling_schedule_type.name, self.initial_temperature, self.cooling_speed, self.temperature_min)
 
-    def thermal_equilibrium_achievement(self):
-        super(PlotTSPSolver, self).thermal_equilibrium_achievement()
+    def start_plot(self):
         if self.plot_coords:
-            if self.state_list[0].solution_list[0].accepted:
-                self.run_plot()
+            context = multiprocessing.get_context("spawn")
+            self.snapshots = context.Queue(maxsize=1)
+            self.plot_process = context.Process(
+                target=render_live, daemon=True,
+                args=(self.snapshots, self.coordinates, self.title, self.frame_rate,
+                      str(FRAMES_DIR.joinpath("live.png"))))
+            self.plot_process.start()
+
+    def stop_plot(self):
+        """
+        sends the last snapshot and waits for the plot process at most STOP_TIMEOUT seconds, a plot process that was
+        closed or crashed isn't waited for.
+        """
+        if self.plot_process is not None:
+            try:
+                for snapshot in ((np.array(self.solution.plan), self.temperature, self.energy), None):
+                    if not self.plot_process.is_alive():
+                        break
+                    self.snapshots.put(snapshot, timeout=STOP_TIMEOUT)
+            except queue.Full:
+                pass
+            self.plot_process.join(timeout=STOP_TIMEOUT)
+            if self.plot_process.is_alive():
+                self.plot_process.terminate()
+            self.snapshots.cancel_join_thread()
+            self.plot_process, self.snapshots = None, None
+
+    def add_solution(self, solution, state=None) -> bool:
+        added = super(PlotTSPSolver, self).add_solution(solution=solution, state=state)
+        if added and self.snapshots is not None and solution.accepted:
+            snapshot_time = time.perf_counter()
+            if snapshot_time - self.snapshot_time >= 1 / self.frame_rate:
+                self.snapshot_time = snapshot_time
+                try:
+                    self.snapshots.put_nowait((np.array(self.solution.plan), self.temperature, self.energy))
+                except queue.Full:
+                    pass
+        return added
 
     def solve(self):
         start_time = time.time()
+        if self.temperature_estimation is not None and None in (self.initial_temperature, self.temperature_min):
+            # temperatures are in the title of the plot, they are estimated before the plot process starts
+            self.estimate_temperatures()
         self.start_plot()
-        super(PlotTSPSolver, self).solve()
+        try:
+            plan = super(PlotTSPSolver, self).solve()
+        finally:
+            self.stop_plot()
         end_time = time.time()
         self.time = end_time - start_time
         if self.save_last_frame:
             self.save_last_state()
-
-    def set_coords(self, coords):
-        self.lines.set_xdata(i[0] for i in coords)
-        self.lines.set_ydata(i[1] for i in coords)
-
-    def run_plot(self):
-        plt.cla()
-        solution = self.state_list[0].solution_list[0]
-        plan = solution.plan
-        energy = solution.energy
-        plt.legend("energy" + str(energy))
-        self.ax.label = "energy" + str(energy)
-        coords = [self.data[i] for i in plan]
-        coords.append(self.data[plan[0]])
-        self.set_coords(coords)
-        self.ax.set_title(
-            "%s Cooling Schedule \n initial temperature: %.2f, cooling_speed: %.2f, minimum temperature: %.2f" %
-            (self.cooling_schedule_type.name, self.initial_temperature, self.cooling_speed, self.temperature_min),
-            color="b"
-        )
-        self.ax.set_xlabel('Latitude', color="r")
-        self.ax.set_ylabel('Longitude', color="r")
-        self.ax.scatter(*zip(*coords), color="r")
-        self.ax.plot(*zip(*coords))
-        self.ax.legend(['Temperature: %.4f - Energy: %.2f' % (round(self.temperature, 7), round(energy, 3))])
-        self.ax.relim()
-        self.ax.autoscale_view()
-        self.figure.canvas.draw()
-        self.figure.canvas.flush_events()
+        return plan
 
     def save_last_state(self):
-        plt.cla()
-        plt.legend("energy" + str(self.energy))
-        self.ax.label = "energy" + str(self.energy)
-        coords = [self.data[i] for i in self.solution.plan]
-        coords.append(self.data[self.solution.plan[0]])
-        self.set_coords(coords)
-        self.ax.scatter(*zip(*coords))
-        self.ax.plot(*zip(*coords))
-        self.ax.legend(['Initial Temp: %.4f - '
-                        'Cooling Speed: %f - '
-                        'Energy: %.2f - '
-                        'Elapsed time: %.5f - '
-                        'Total Generated Solutions: %d' %
-                        (round(self.initial_temperature, 7),
-                         self.cooling_speed,
-                         round(self.energy, 3),
-                         self.time,
-                         self.total_generated_solution)])
-        self.ax.relim()
-        self.ax.autoscale_view()
-        self.figure.canvas.draw()
-        self.figure.canvas.flush_events()
-        base_dir = pathlib.Path(__file__).parent.parent.absolute()
-        self.figure.savefig(
-            base_dir.joinpath("tests").joinpath("frames").joinpath(
+        best_solution = self.best_solution
+        figure, ax, line, label = route_axes(self.coordinates, self.title)
+        route = self.coordinates[np.append(best_solution.plan, best_solution.plan[0])]
+        line.set_data(route[:, 0], route[:, 1])
+        label.set(text='Initial Temp: %.4f - '
+                       'Cooling Speed: %f - '
+                       'Energy: %.2f - '
+                       'Elapsed time: %.5f - '
+                       'Total Generated Solutions: %d' %
+                       (round(self.initial_temperature, 7),
+                        self.cooling_speed,
+                        round(best_solution.energy, 3),
+                        self.time,
+                        self.total_generated_solution))
+        figure.savefig(
+            FRAMES_DIR.joinpath(
                 "%s-%s-%s-%s-%s.png" % (
                     str(len(self.solution.plan)),
                     str(self.cooling_schedule_type.name),
@@ -108,4 +121,4 @@ class PlotTSPSolver(tsp.TSPSolver):
                 )
             )
         )
-        plt.close()
+        plt.close(figure)
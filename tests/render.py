@@ -0,0 +1,137 @@
+"""
+animation of a recorded run. frames are rebuilt from a trace that was saved with the coordinates of the locations and
+drawn in parallel by a pool of processes, the run itself only records accepted moves:
+    solver = TSPSolver(data=data, trace=Trace(), ...)
+    solver.solve()
+    solver.trace.save("run.npz", coordinates=solver.coordinates)
+    python -m tests.render run.npz tests/example.gif --frames 200 --fps 20
+
+gif files are written with Pillow, other formats like mp4 with imageio.
+"""
+import argparse
+import concurrent.futures
+import os
+import pathlib
+import tempfile
+import typing
+
+import matplotlib.pyplot as plt
+import numpy as np
+from PIL import Image
+
+from algorithm.trace import Trace
+from solvers import kernel
+from tests.live_plot import route_axes
+
+try:
+    import imageio
+except ImportError:
+    imageio = None
+
+
+def frame_indexes(
+        length,  # type: int
+        frames,  # type: int
+) -> np.ndarray:
+    """
+    :return indexes: evenly spaced indexes of accepted solutions, the first and the last one are included
+    """
+    return np.unique(np.linspace(0, length - 1, min(frames, length)).round().astype(np.int64))
+
+
+def apply_move(
+        plan,  # type: np.ndarray
+        move,  # type: tuple
+):
+    kernel.apply_move(plan, *move)
+
+
+def render_frames(
+        path,  # type: typing.Union[str, os.PathLike]
+        indexes,  # type: typing.Sequence[int]
+        directory,  # type: typing.Union[str, os.PathLike]
+        title="",  # type: str
+        dpi=50,  # type: int
+) -> typing.List[str]:
+    """
+    runs in a worker process, draws the accepted solutions at indexes of the trace at path to png files.
+    :return paths: png file of each index
+    """
+    plt.switch_backend("Agg")
+    trace = Trace.load(path)
+    coordinates = trace.arrays["coordinates"]
+    figure, ax, line, label = route_axes(coordinates, title)
+    paths = []
+    for index in indexes:
+        plan = trace.plan(index, apply_move=apply_move)
+        route = coordinates[np.append(plan, plan[0])]
+        line.set_data(route[:, 0], route[:, 1])
+        label.set_text('Temperature: %.4f - Energy: %.2f' % (trace.temperature[index], trace.energy[index]))
+        paths.append(str(pathlib.Path(directory).joinpath("%08d.png" % index)))
+        figure.savefig(paths[-1], dpi=dpi)
+    plt.close(figure)
+    return paths
+
+
+def write_animation(
+        paths,  # type: typing.Sequence[str]
+        output,  # type: typing.Union[str, os.PathLike]
+        fps,  # type: float
+):
+    """
+    :param paths: png files of the frames in order
+    """
+    if pathlib.Path(output).suffix.lower() == ".gif":
+        images = [Image.open(path) for path in paths]
+        images[0].save(output, save_all=True, append_images=images[1:], duration=1000 / fps, loop=0)
+        return
+    if imageio is None:
+        raise ImportError("imageio is needed to write %s files" % pathlib.Path(output).suffix)
+    with imageio.get_writer(output, fps=fps) as writer:
+        for path in paths:
+            writer.append_data(imageio.imread(path))
+
+
+def render(
+        path,  # type: typing.Union[str, os.PathLike]
+        output,  # type: typing.Union[str, os.PathLike]
+        frames=100,  # type: int
+        fps=10,  # type: float
+        processes=None,  # type: typing.Optional[int]
+        title="",  # type: str
+        dpi=50,  # type: int
+):
+    """
+    :param path: trace saved with coordinates
+    :param output: animation file, its suffix chooses the format
+    :param frames: number of frames, at most one frame for each accepted solution
+    :param processes: number of worker processes, number of cpus if not given
+    """
+    processes = processes or os.cpu_count() or 1
+    indexes = frame_indexes(len(Trace.load(path)), frames=frames)
+    # each worker rebuilds the plans of consecutive frames, a chunk of frames is one task
+    chunks = [chunk for chunk in np.array_split(indexes, processes * 4) if len(chunk)]
+    with tempfile.TemporaryDirectory() as directory:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=processes) as executor:
+            results = executor.map(render_frames, [path] * len(chunks), [chunk.tolist() for chunk in chunks],
+                                   [directory] * len(chunks), [title] * len(chunks), [dpi] * len(chunks))
+            paths = [frame_path for chunk_paths in results for frame_path in chunk_paths]
+        write_animation(paths, output, fps=fps)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("trace", type=pathlib.Path)
+    parser.add_argument("output", type=pathlib.Path)
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--fps", type=float, default=10)
+    parser.add_argument("--processes", type=int)
+    parser.add_argument("--title", default="")
+    parser.add_argument("--dpi", type=int, default=50)
+    arguments = parser.parse_args()
+    render(arguments.trace, arguments.output, frames=arguments.frames, fps=arguments.fps,
+           processes=arguments.processes, title=arguments.title, dpi=arguments.dpi)
+
+
+if __name__ == '__main__':
+    main()
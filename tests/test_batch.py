@@ -0,0 +1,27 @@
+import pytest
+
+from algorithm.annealing import SMA
+from solvers.tsp import MoveType
+
+
+def test_batch_energy_variations_match_single_moves(make_solver):
+    solver = make_solver(move_probabilities={move_type: 1 for move_type in MoveType}, batch_size=64)
+    moves = solver.generate_move_batch(size=256)
+    energy_variations = solver.objective_function_variations(moves=moves)
+    expected = [solver.objective_function(solver.move_solution(move=tuple(move))) - solver.energy
+                for move in moves.tolist()]
+    assert energy_variations == pytest.approx(expected, abs=1e-9 * solver.energy)
+    assert SMA.objective_function_variations(solver, moves=moves) == pytest.approx(expected, abs=1e-9 * solver.energy)
+
+
+def test_batches_accept_the_first_move_that_passes_metropolis_criterion(make_solver):
+    solver = make_solver(move_probabilities={MoveType.TWO_OPT: 0.7, MoveType.OR_OPT: 0.3}, initial_temperature=100,
+                         temperature_min=1, cooling_speed=0.9, steps=500, batch_size=64, verify_energy=True)
+    plan = solver.solve()
+    assert sorted(plan) == sorted(solver.locations)
+    assert solver.best.energy == pytest.approx(solver.objective_function(solver.best_solution))
+
+
+def test_batches_reject_candidate_lists(make_solver):
+    with pytest.raises(ValueError):
+        make_solver(batch_size=64, candidate_neighbours=4)
@@ -0,0 +1,53 @@
+import random
+
+import pytest
+
+from algorithm.annealing import Solution
+from algorithm.best import BestSolution
+from algorithm.history import History
+from data import example_data
+from solvers.distance import DistanceCalculatorType
+from solvers.tsp import MoveType, TSPSolver
+
+
+class SwapSolver:
+    @staticmethod
+    def apply_move(plan, move):
+        plan[move[0]], plan[move[1]] = plan[move[1]], plan[move[0]]
+
+
+@pytest.mark.parametrize("limit", [None, 1, 3, 50])
+def test_best_plan_is_the_plan_of_the_lowest_energy(limit):
+    solver, generator = SwapSolver(), random.Random(limit)
+    best = BestSolution(limit=limit)
+    plan, energy = list(range(10)), 100.0
+    best.record(solver=solver, solution=Solution(plan=list(plan), energy=energy))
+    lowest_energy, lowest_plan = energy, list(plan)
+    for _ in range(500):
+        move = tuple(generator.sample(range(10), 2))
+        SwapSolver.apply_move(plan, move)
+        energy += generator.uniform(-1, 1.05)
+        best.record(solver=solver, solution=Solution(plan=plan, energy=energy, move=move))
+        if energy < lowest_energy:
+            lowest_energy, lowest_plan = energy, list(plan)
+        if generator.random() < 0.05:
+            assert best.best_plan(solver=solver) == lowest_plan
+        assert best.energy == lowest_energy
+    assert best.best_plan(solver=solver) == lowest_plan
+
+
+def test_solver_best_solution_is_the_best_accepted_solution():
+    history = History(capacity=2 ** 16)
+    solver = TSPSolver(data=example_data.LOCATIONS_22, steps=50, initial_temperature=100., temperature_min=1.,
+                       cooling_speed=0.95, distance_calculator=DistanceCalculatorType.HAVERSINE, seed=5,
+                       history=history, move_probabilities={MoveType.TWO_OPT: 0.7, MoveType.OR_OPT: 0.3})
+    solver.best = BestSolution(limit=4)
+    solver.best.reset(plan=solver.solution.plan, energy=solver.energy)
+    initial_energy = solver.energy
+    for _ in solver.iter_solve():
+        pass
+    columns = history.columns()
+    accepted_energies = [energy for energy, accepted in zip(columns["energy"], columns["accepted"]) if accepted]
+    assert len(history) == history.step
+    assert solver.best.energy == min(accepted_energies + [initial_energy])
+    assert solver.objective_function(solver.best_solution) == pytest.approx(solver.best.energy)
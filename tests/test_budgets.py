@@ -0,0 +1,45 @@
+import time
+
+import pytest
+
+from algorithm.cooling_schedule import CoolingScheduleType
+from solvers.tsp import MoveType
+from tests.conftest import symmetric_solver
+
+# tens of thousands of temperatures without a budget
+SOLVER_ARGUMENTS = dict(initial_temperature=100., temperature_min=1., cooling_speed=0.99995, steps=1000,
+                        move_probabilities={MoveType.TWO_OPT: 0.7, MoveType.OR_OPT: 0.3})
+
+
+@pytest.mark.parametrize("cooling_schedule_type, cooling_speed", [
+    (CoolingScheduleType.GEOMETRIC, 0.99995),
+    (CoolingScheduleType.EXPONENTIAL, 0.00005),
+    (CoolingScheduleType.LOGARITHMIC, 0.11),
+])
+def test_evaluation_budget_stops_the_run_at_the_end_of_the_schedule(cooling_schedule_type, cooling_speed):
+    solver = symmetric_solver(**dict(SOLVER_ARGUMENTS, cooling_schedule_type=cooling_schedule_type,
+                                     cooling_speed=cooling_speed, evaluation_budget=5000))
+    assert solver.CoolingCountChoices[cooling_schedule_type.value]() > 50000
+    solver.solve()
+    assert solver.evaluations <= 5000
+    assert solver.temperature < 2 * solver.temperature_min
+
+
+def test_time_budget_stops_the_run():
+    solver = symmetric_solver(**dict(SOLVER_ARGUMENTS, time_budget=0.3))
+    start_time = time.perf_counter()
+    solver.solve()
+    assert 0.3 <= time.perf_counter() - start_time < 1.0
+    assert solver.temperature < 2 * solver.temperature_min
+
+
+def test_progress():
+    progress = list(symmetric_solver(**dict(SOLVER_ARGUMENTS, evaluation_budget=2000)).iter_solve())
+    assert [item.evaluations for item in progress] == sorted(item.evaluations for item in progress)
+    assert all(item.best_energy <= item.energy for item in progress)
+
+
+def test_callback_stops_the_run():
+    solver = symmetric_solver(**dict(SOLVER_ARGUMENTS, callback=lambda progress: progress.evaluations >= 1000))
+    solver.solve()
+    assert 1000 <= solver.evaluations <= 1001 + SOLVER_ARGUMENTS["steps"]
@@ -0,0 +1,60 @@
+import concurrent.futures
+import os
+import time
+
+import numpy as np
+
+from solvers.cache import DistanceMatrixCache
+from solvers.distance import DistanceCalculatorType
+
+
+def coordinates(seed, size=20):
+    return np.random.default_rng(seed).random((size, 2)) * 100
+
+
+def test_miss_then_hit(tmp_path, monkeypatch):
+    cache = DistanceMatrixCache(tmp_path)
+    calls = []
+    original_set = cache.set
+    monkeypatch.setattr(cache, "set", lambda key, matrix: calls.append(key) or original_set(key, matrix))
+    first = cache.distance_matrix(coordinates(0), DistanceCalculatorType.EUCLIDEAN)
+    second = cache.distance_matrix(coordinates(0), DistanceCalculatorType.EUCLIDEAN)
+    assert len(calls) == 1
+    assert isinstance(second, np.memmap)
+    assert np.array_equal(first, second)
+    # another calculator or other coordinates are another key
+    cache.distance_matrix(coordinates(0), DistanceCalculatorType.HAVERSINE)
+    cache.distance_matrix(coordinates(1), DistanceCalculatorType.EUCLIDEAN)
+    assert len(calls) == 3
+    assert len(list(tmp_path.glob("*.npy"))) == 3
+
+
+def test_local_functions_are_not_cached(tmp_path):
+    cache = DistanceMatrixCache(tmp_path)
+    cache.distance_matrix(coordinates(0), lambda origin, destination: abs(origin[0] - destination[0]))
+    assert not list(tmp_path.glob("*.npy"))
+
+
+def test_least_recently_used_matrices_are_evicted(tmp_path):
+    matrix_size = 20 * 20 * 8 + 128  # float64 matrix and npy header
+    cache = DistanceMatrixCache(tmp_path, max_size=2 * matrix_size)
+    keys = [cache.key(coordinates(seed), DistanceCalculatorType.EUCLIDEAN) for seed in range(3)]
+    cache.distance_matrix(coordinates(0), DistanceCalculatorType.EUCLIDEAN)
+    cache.distance_matrix(coordinates(1), DistanceCalculatorType.EUCLIDEAN)
+    # key 0 was used after key 1, so key 1 is the least recently used one
+    past = time.time() - 100
+    os.utime(cache.path(keys[1]), (past, past))
+    cache.distance_matrix(coordinates(2), DistanceCalculatorType.EUCLIDEAN)
+    assert cache.path(keys[0]).exists()
+    assert not cache.path(keys[1]).exists()
+    assert cache.path(keys[2]).exists()
+
+
+def test_threads_writing_the_same_key(tmp_path):
+    cache = DistanceMatrixCache(tmp_path)
+    matrix = np.arange(400, dtype=np.float64).reshape(20, 20)
+    key = cache.key(coordinates(0), DistanceCalculatorType.EUCLIDEAN)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: np.array(cache.set(key, matrix)), range(32)))
+    assert all(np.array_equal(result, matrix) for result in results)
+    assert not list(tmp_path.glob("*.tmp"))
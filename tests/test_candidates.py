@@ -0,0 +1,65 @@
+import statistics
+
+import numpy as np
+import pytest
+
+from solvers.distance import DistanceCalculatorType
+from solvers.tsp import MoveType, TSPSolver
+from tests.conftest import symmetric_solver
+
+RANDOM_POINTS = np.random.default_rng(1).random((100, 2)) * 1000
+
+
+def edges(plan):
+    return {frozenset(edge) for edge in zip(plan, plan[1:] + plan[:1])}
+
+
+def median_best_energy(candidate_neighbours, **kwargs):
+    energies = []
+    for seed in range(3):
+        solver = TSPSolver(data=RANDOM_POINTS, initial_temperature=100, temperature_min=1, steps=1000,
+                           distance_calculator=DistanceCalculatorType.EUCLIDEAN, seed=seed,
+                           move_probabilities={MoveType.TWO_OPT: 0.7, MoveType.OR_OPT: 0.3},
+                           candidate_neighbours=candidate_neighbours, **kwargs)
+        solver.solve()
+        energies.append(solver.best.energy)
+    return statistics.median(energies)
+
+
+@pytest.mark.parametrize("move_type", list(MoveType))
+def test_candidate_moves_connect_location_with_a_candidate(move_type):
+    solver = symmetric_solver(move_probabilities={move_type: 1}, candidate_neighbours=4)
+    solver.create_and_add_new_state()
+    moves = 0
+    for _ in range(500):
+        move = solver.candidate_move(move_type)
+        if move is None:
+            continue
+        moves += 1
+        plan = solver.move_solution(move=move).plan
+        new_edges = edges(plan) - edges(solver.solution.plan)
+        assert new_edges
+        assert any(neighbour in solver.candidate_lists[location]
+                   for edge in new_edges for location, neighbour in (tuple(edge), tuple(edge)[::-1]))
+    assert moves
+
+
+def test_positions_follow_accepted_moves():
+    solver = symmetric_solver(move_probabilities={move_type: 1 for move_type in MoveType}, candidate_neighbours=4)
+    for _ in range(200):
+        solver.create_and_add_new_state()
+        move = solver.generate_move()
+        solver.accept_move(move=move, energy_variation=solver.move_energy_variation(move=move))
+        assert [solver.positions[location] for location in solver.solution.plan] == list(range(22))
+
+
+def test_candidate_lists_dont_make_tours_worse_with_a_fixed_schedule():
+    """
+    a temperature ends at its first accepted move, candidate moves that didn't change the tour ended most of them.
+    """
+    assert median_best_energy(8, cooling_speed=0.99) <= 1.02 * median_best_energy(0, cooling_speed=0.99)
+
+
+def test_candidate_lists_give_better_tours_for_an_evaluation_budget():
+    assert median_best_energy(8, cooling_speed=0.99, evaluation_budget=20000) < \
+        median_best_energy(0, cooling_speed=0.99, evaluation_budget=20000)
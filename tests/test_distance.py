@@ -0,0 +1,38 @@
+import numpy as np
+
+from data import example_data
+from solvers import distance
+from solvers.distance import DistanceCalculatorType
+
+
+class UnhashableCalculator:
+    __hash__ = None
+
+    def __call__(self, origin, destination):
+        return distance.haversine(origin, destination)
+
+
+def test_vectorized_matrix_matches_per_pair_calculator():
+    coordinates = np.array(list(example_data.LOCATIONS_22.values()), dtype=np.float64)
+    matrix = distance.distance_matrix(coordinates, DistanceCalculatorType.HAVERSINE)
+    assert np.allclose(matrix, distance.distance_matrix(coordinates, UnhashableCalculator()))
+    assert np.array_equal(matrix, matrix.T)
+
+
+def test_solver_accepts_unhashable_calculator():
+    from solvers.tsp import TSPSolver
+    solver = TSPSolver(data=example_data.LOCATIONS_22, initial_temperature=1, temperature_min=1, cooling_speed=1,
+                       distance_calculator=UnhashableCalculator(), candidate_neighbours=4)
+    assert solver.symmetric_distance
+    assert len(solver.candidate_lists) == 22
+
+
+def test_symmetry_of_explicit_matrices_is_checked_in_blocks():
+    from solvers.tsp import SYMMETRY_BLOCK_ROWS, TSPSolver
+    size = SYMMETRY_BLOCK_ROWS + 10
+    matrix = np.random.default_rng(0).random((size, size))
+    matrix += matrix.T
+    arguments = dict(data=dict.fromkeys(range(size)), initial_temperature=1, temperature_min=1, cooling_speed=1)
+    assert TSPSolver(distance_matrix_result=matrix, **arguments).symmetric_distance
+    matrix[size - 1, 0] += 1
+    assert not TSPSolver(distance_matrix_result=matrix, **arguments).symmetric_distance
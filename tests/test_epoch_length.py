@@ -0,0 +1,24 @@
+import numpy as np
+
+from algorithm.epoch_length import EpochLength, EpochLengthType
+from solvers.distance import DistanceCalculatorType
+from solvers.tsp import TSPSolver
+from tests.conftest import symmetric_solver
+
+
+def test_default_steps_are_linear_in_instance_size():
+    assert symmetric_solver().steps == 22 * 21
+    solver = TSPSolver(data=np.random.default_rng(0).random((2000, 2)), initial_temperature=1, temperature_min=1,
+                       cooling_speed=1, distance_calculator=DistanceCalculatorType.EUCLIDEAN)
+    assert solver.steps == 100 * 2000
+
+
+def test_epoch_lengths():
+    solver = symmetric_solver()
+    assert EpochLength(EpochLengthType.NEIGHBOURHOOD).steps(solver=solver) == 22 * 21
+    assert EpochLength(EpochLengthType.LINEAR, size_factor=10).steps(solver=solver) == 220
+    adaptive = EpochLength(EpochLengthType.ADAPTIVE, size_factor=10, margin=3)
+    adaptive.start()
+    assert adaptive.steps(solver=solver) == 220
+    adaptive.update(steps=30, accepted=True, elapsed_time=0.1)
+    assert adaptive.steps(solver=solver) == 90
@@ -0,0 +1,40 @@
+from algorithm.history import History
+from tests.conftest import symmetric_solver
+
+
+def test_ring_buffer_keeps_last_steps_in_order():
+    history = History(capacity=4, move_size=3)
+    for step in range(10):
+        history.record(temperature=step, energy=step * 10, accepted=step % 2 == 0, move=(step, step + 1))
+    assert len(history) == 4
+    columns = history.columns()
+    assert list(columns["temperature"]) == [6, 7, 8, 9]
+    assert list(columns["energy"]) == [60, 70, 80, 90]
+    assert list(columns["accepted"]) == [1, 0, 1, 0]
+    assert list(columns["move"]) == [6, 7, -1, 7, 8, -1, 8, 9, -1, 9, 10, -1]
+
+
+def test_partly_filled_buffer():
+    history = History(capacity=8)
+    history.record(temperature=1, energy=2, accepted=True)
+    assert len(history) == 1
+    assert list(history.columns()["move"]) == [-1] * 4
+
+
+def test_snapshots():
+    history = History(capacity=4, snapshot_interval=2, snapshot_capacity=2, snapshot_best=True)
+    for step, energy in enumerate([5, 3, 4, 1, 2]):
+        history.record(temperature=1, energy=energy, accepted=True)
+        history.record_solution(temperature=1, energy=energy, plan=[step])
+    assert [snapshot.step for snapshot in history.snapshots] == [2, 4]
+    assert history.best.energy == 1 and history.best.plan == [3]
+
+
+def test_solver_records_every_step():
+    history = History(capacity=64)
+    solver = symmetric_solver(steps=100, initial_temperature=10, temperature_min=1, cooling_speed=0.5,
+                              history=history)
+    solver.solve()
+    assert history.step == solver.total_generated_solution
+    assert len(history) == min(history.step, 64)
+    assert any(history.columns()["accepted"])
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from algorithm.cooling_schedule import CoolingScheduleType
+from algorithm.metrics import Metrics
+from algorithm.trace import Trace
+from data import example_data
+from solvers import kernel
+from solvers.distance import DistanceCalculatorType
+from tests.conftest import asymmetric_solver
+from solvers.tsp import MoveType, TSPSolver
+
+SOLVER_ARGUMENTS = dict(
+    data=example_data.LOCATIONS_22, steps=100, initial_temperature=100., temperature_min=1., cooling_speed=0.95,
+    cooling_schedule_type=CoolingScheduleType.GEOMETRIC, distance_calculator=DistanceCalculatorType.HAVERSINE,
+    move_probabilities={MoveType.SWAP: 0.2, MoveType.TWO_OPT: 0.5, MoveType.OR_OPT: 0.3}, seed=7,
+)
+
+
+def solve(**kwargs):
+    solver = TSPSolver(**dict(SOLVER_ARGUMENTS, **kwargs))
+    return solver, solver.solve()
+
+
+def test_compiled_and_python_kernels_give_the_same_result(monkeypatch):
+    solver, plan = solve(use_kernel=True)
+    monkeypatch.setattr(kernel, "anneal", getattr(kernel.anneal, "py_func", kernel.anneal))
+    python_solver, python_plan = solve(use_kernel=True)
+    assert python_plan == plan
+    assert python_solver.best.energy == solver.best.energy
+    assert python_solver.k == solver.k
+
+
+@pytest.mark.parametrize("make_solver", [
+    lambda **kwargs: TSPSolver(data=np.random.default_rng(2).random((200, 2)) * 1000,
+                               distance_calculator=DistanceCalculatorType.EUCLIDEAN, **kwargs),
+    asymmetric_solver,
+], ids=["random_200", "asymmetric"])
+def test_compiled_and_python_kernels_match_with_2_opt_and_or_opt(monkeypatch, make_solver):
+    arguments = dict(initial_temperature=100., temperature_min=1., cooling_speed=0.95, steps=200, seed=11,
+                     cooling_schedule_type=CoolingScheduleType.GEOMETRIC, use_kernel=True,
+                     move_probabilities={MoveType.TWO_OPT: 0.7, MoveType.OR_OPT: 0.3})
+    solver = make_solver(**arguments)
+    plan = solver.solve()
+    monkeypatch.setattr(kernel, "anneal", getattr(kernel.anneal, "py_func", kernel.anneal))
+    python_solver = make_solver(**arguments)
+    assert python_solver.solve() == plan
+    assert python_solver.best.energy == solver.best.energy
+    assert python_solver.energy == solver.energy
+    assert python_solver.evaluations == solver.evaluations == solver.total_generated_solution > 0
+
+
+def test_kernel_result_differs_from_python_solver_but_is_consistent():
+    """
+    the kernel draws moves from numpy blocks and the python solver from random.Random, so a seed gives different
+    tours. both are permutations whose best energy is the energy of the returned plan.
+    """
+    for use_kernel in (True, False):
+        solver, plan = solve(use_kernel=use_kernel)
+        assert sorted(plan) == sorted(SOLVER_ARGUMENTS["data"])
+        assert solver.best.energy == pytest.approx(solver.objective_function(solver.best_solution))
+
+
+@pytest.mark.parametrize("kwargs", [
+    dict(verify_energy=True),
+    dict(old_states=True),
+    dict(old_solutions=True),
+    dict(metrics=Metrics()),
+    dict(trace=Trace()),
+    dict(batch_size=16),
+    dict(evaluation_budget=1000),
+    dict(candidate_neighbours=4),
+])
+def test_kernel_rejects_unsupported_options(kwargs):
+    solver = TSPSolver(**dict(SOLVER_ARGUMENTS, use_kernel=True, **kwargs))
+    with pytest.raises(ValueError):
+        solver.solve()
@@ -0,0 +1,72 @@
+import pytest
+
+from data import loader
+from solvers.distance import DistanceCalculatorType
+
+
+def test_section_keywords_in_header_values_are_not_sections(tmp_path):
+    path = tmp_path.joinpath("keywords.tsp")
+    path.write_text("NAME: NODE_COORD_SECTION\n"
+                    "COMMENT: ends with EOF\n"
+                    "TYPE: TSP\n"
+                    "DIMENSION: 3\n"
+                    "EDGE_WEIGHT_TYPE: EUC_2D\n"
+                    "NODE_COORD_SECTION\n"
+                    "2 3 4\n"
+                    "1 1 2\n"
+                    "3 5 6\n"
+                    "EOF\n")
+    instance = loader.load_tsplib(path)
+    assert instance.name == "NODE_COORD_SECTION"
+    assert instance.coordinates.tolist() == [[1, 2], [3, 4], [5, 6]]
+    assert instance.distance_calculator == DistanceCalculatorType.EUC_2D
+
+
+def test_explicit_upper_row_matrix(tmp_path):
+    path = tmp_path.joinpath("explicit.tsp")
+    path.write_text("NAME : explicit\n"
+                    "DIMENSION : 3\n"
+                    "EDGE_WEIGHT_TYPE : EXPLICIT\n"
+                    "EDGE_WEIGHT_FORMAT : UPPER_ROW\n"
+                    "EDGE_WEIGHT_SECTION\n"
+                    "1 2\n"
+                    "3\n"
+                    "EOF\n")
+    instance = loader.load_tsplib(path)
+    assert instance.matrix.tolist() == [[0, 1, 2], [1, 0, 3], [2, 3, 0]]
+    assert instance.coordinates is None
+
+
+def test_csv_with_header_quotes_and_other_columns(tmp_path):
+    path = tmp_path.joinpath("locations.csv")
+    path.write_text('name,x,y\n'
+                    '# a comment\n'
+                    '"Depot, north",1.5,2\n'
+                    '"Shop ""A""",3,4\n'
+                    '\n'
+                    'C,5,6\n')
+    instance = loader.load(path, delimiter=",", columns=(1, 2))
+    assert instance.name == "locations"
+    assert instance.coordinates.tolist() == [[1.5, 2], [3, 4], [5, 6]]
+
+
+def test_whitespace_separated_csv(tmp_path):
+    path = tmp_path.joinpath("locations.txt")
+    path.write_text("  1 2\n3\t4\n5   6  \n")
+    assert loader.load(path).coordinates.tolist() == [[1, 2], [3, 4], [5, 6]]
+
+
+def test_csv_errors_name_file_and_line(tmp_path):
+    path = tmp_path.joinpath("locations.csv")
+    path.write_text("x,y\n1,2\n3,north\n")
+    with pytest.raises(ValueError, match=r"locations.csv line 3 .*north"):
+        loader.load(path, delimiter=",")
+    path.write_text("1,2\n3\n")
+    with pytest.raises(ValueError, match=r"locations.csv line 2 has 1 columns"):
+        loader.load(path, delimiter=",")
+
+
+def test_parse_numbers_rejects_values_that_arent_numbers():
+    assert loader.parse_numbers("1 2\n3 4", columns=2).tolist() == [[1, 2], [3, 4]]
+    with pytest.raises(ValueError, match="aren't numbers"):
+        loader.parse_numbers("1 2 x 4")
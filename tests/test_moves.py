@@ -0,0 +1,26 @@
+import pytest
+
+from solvers.tsp import MoveType
+from tests.conftest import symmetric_solver
+
+NEIGHBOURHOOD_MOVES = [MoveType.TWO_OPT, MoveType.OR_OPT, MoveType.INSERTION]
+
+
+@pytest.mark.parametrize("move_type", NEIGHBOURHOOD_MOVES)
+def test_move_energy_variation_matches_full_objective_function(make_solver, move_type):
+    solver = make_solver(move_probabilities={move_type: 1})
+    for _ in range(200):
+        move = solver.random_move(move_type)
+        new_solution = solver.move_solution(move=move)
+        assert sorted(new_solution.plan) == list(range(len(solver.locations)))
+        assert solver.objective_function_variation(move=move) == pytest.approx(
+            solver.objective_function(new_solution) - solver.energy, abs=1e-9 * solver.energy)
+
+
+def test_accepted_moves_keep_energy_consistent():
+    solver = symmetric_solver(move_probabilities={move_type: 1 for move_type in MoveType})
+    for _ in range(100):
+        move = solver.random_move(solver.random_move_type())
+        solver.create_and_add_new_state()
+        solver.accept_move(move=move, energy_variation=solver.move_energy_variation(move=move))
+    assert solver.energy == pytest.approx(solver.objective_function(solver.solution))
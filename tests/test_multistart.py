@@ -0,0 +1,25 @@
+import math
+
+from data import example_data
+from solvers.distance import DistanceCalculatorType
+from solvers.parallel import MultiStartSolver
+
+SOLVER_ARGUMENTS = dict(
+    data=example_data.LOCATIONS_22, starts=8, max_workers=1, seed=5, initial_temperature=10., temperature_min=0.1,
+    cooling_speed=0.9, steps=50, distance_calculator=DistanceCalculatorType.HAVERSINE,
+)
+
+
+def test_all_starts_run_without_target_energy():
+    solver = MultiStartSolver(**SOLVER_ARGUMENTS)
+    results = list(solver.iter_solve())
+    assert sorted(result.seed for result in results) == sorted(solver.seeds)
+    assert solver.best.energy == min(result.energy for result in results)
+    assert sorted(solver.best.plan) == sorted(SOLVER_ARGUMENTS["data"])
+
+
+def test_target_energy_cancels_remaining_starts():
+    solver = MultiStartSolver(**dict(SOLVER_ARGUMENTS, target_energy=math.inf))
+    results = list(solver.iter_solve())
+    assert 1 <= len(results) < solver.starts
+    assert solver.best.energy <= solver.target_energy
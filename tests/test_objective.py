@@ -0,0 +1,29 @@
+import pytest
+
+from algorithm.annealing import SMA, ObjectiveFunction, SolutionGenerator
+from solvers.tsp import MoveType
+
+
+def test_swap_energy_variation_matches_full_objective_function(make_solver):
+    solver = make_solver(move_probabilities={MoveType.SWAP: 1})
+    for _ in range(200):
+        move = solver.random_move(MoveType.SWAP)
+        assert solver.objective_function_variation(move=move) == pytest.approx(
+            solver.objective_function(solver.move_solution(move=move)) - solver.energy, abs=1e-9 * solver.energy)
+
+
+def test_default_energy_variations_evaluate_moves_one_by_one(make_solver):
+    solver = make_solver(move_probabilities={MoveType.SWAP: 1}, batch_size=16)
+    moves = solver.generate_move_batch(size=64)
+    expected = [solver.objective_function(solver.move_solution(move=tuple(move))) - solver.energy
+                for move in moves.tolist()]
+    assert SMA.objective_function_variations(solver, moves=moves) == pytest.approx(expected, abs=1e-9 * solver.energy)
+
+
+def test_interface_declarations():
+    """
+    the mixins declare their interface with abstractmethod, SMA gives objective_function_variations a default.
+    """
+    assert ObjectiveFunction.objective_function_variations.__isabstractmethod__
+    assert SolutionGenerator.apply_move.__isabstractmethod__
+    assert not getattr(SMA.objective_function_variations, "__isabstractmethod__", False)
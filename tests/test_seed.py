@@ -0,0 +1,27 @@
+import pytest
+
+from solvers.tsp import MoveType
+
+MOVE_PROBABILITIES = {MoveType.SWAP: 0.2, MoveType.TWO_OPT: 0.5, MoveType.OR_OPT: 0.3}
+
+
+def solve(make_solver, **kwargs):
+    solver = make_solver(**dict(dict(initial_temperature=100, temperature_min=1, cooling_speed=0.95, steps=200,
+                                     move_probabilities=MOVE_PROBABILITIES), **kwargs))
+    return solver.solve(), solver.best.energy
+
+
+@pytest.mark.parametrize("kwargs", [{}, dict(batch_size=16), dict(candidate_neighbours=4)])
+def test_same_seed_gives_the_same_tour(make_solver, kwargs):
+    assert solve(make_solver, seed=7, **kwargs) == solve(make_solver, seed=7, **kwargs)
+
+
+def test_different_seeds_give_different_runs(make_solver):
+    assert solve(make_solver, seed=7) != solve(make_solver, seed=8)
+
+
+def test_reseed_repeats_metropolis_thresholds(make_solver):
+    solver = make_solver(seed=7)
+    thresholds = [solver.acceptance_threshold() for _ in range(10)]
+    solver.reseed(seed=7)
+    assert [solver.acceptance_threshold() for _ in range(10)] == thresholds
@@ -0,0 +1,56 @@
+import csv
+
+import pytest
+
+from data import example_data
+from solvers import sweep
+from solvers.distance import DistanceCalculatorType
+
+SOLVER_ARGUMENTS = dict(
+    data=example_data.LOCATIONS_22, max_workers=1, seed=5, initial_temperature=10., temperature_min=0.1, steps=50,
+    distance_calculator=DistanceCalculatorType.HAVERSINE,
+)
+
+
+def read_rows(path):
+    with open(path, newline="") as result_file:
+        reader = csv.DictReader(result_file)
+        return reader.fieldnames, list(reader)
+
+
+def test_grid():
+    assert sweep.grid({"a": [1, 2], "b": [3]}) == [{"a": 1, "b": 3}, {"a": 2, "b": 3}]
+
+
+def test_resume_runs_only_missing_configurations(tmp_path):
+    path = tmp_path.joinpath("sweep.csv")
+    first = sweep.Sweep(configurations=sweep.grid({"cooling_speed": [0.9]}), path=path, **SOLVER_ARGUMENTS)
+    assert len(list(first.run())) == 1
+    resumed = sweep.Sweep(configurations=sweep.grid({"cooling_speed": [0.9, 0.8]}), path=path, repeats=2,
+                          **SOLVER_ARGUMENTS)
+    assert sorted((row["cooling_speed"], row["repeat"]) for row in resumed.run()) == [(0.8, 0), (0.8, 1), (0.9, 1)]
+    assert not resumed.pending_runs()
+    fieldnames, rows = read_rows(path)
+    assert len(rows) == 4
+    assert list(resumed.run()) == []
+
+
+def test_resume_keeps_column_order_of_existing_file(tmp_path):
+    path = tmp_path.joinpath("sweep.csv")
+    header = list(reversed(sweep.RESULT_FIELDS)) + ["cooling_speed"]
+    with open(path, "w", newline="") as result_file:
+        csv.writer(result_file).writerow(header)
+    runs = sweep.Sweep(configurations=sweep.grid({"cooling_speed": [0.9]}), path=path, **SOLVER_ARGUMENTS)
+    row, = runs.run()
+    fieldnames, rows = read_rows(path)
+    assert fieldnames == header
+    assert rows == [{name: str(row[name]) for name in header}]
+
+
+def test_resume_rejects_file_without_parameter_column(tmp_path):
+    path = tmp_path.joinpath("sweep.csv")
+    list(sweep.Sweep(configurations=sweep.grid({"cooling_speed": [0.9]}), path=path, **SOLVER_ARGUMENTS).run())
+    configurations = sweep.grid({"cooling_speed": [0.9], "steps": [20]})
+    runs = sweep.Sweep(configurations=configurations, path=path, **SOLVER_ARGUMENTS)
+    with pytest.raises(ValueError, match="steps"):
+        list(runs.run())
@@ -0,0 +1,50 @@
+import math
+
+import pytest
+
+from algorithm.annealing import Solution
+from data import example_data
+from solvers.distance import DistanceCalculatorType
+from solvers.parallel import ParallelTemperingSolver
+
+SOLVER_ARGUMENTS = dict(
+    data=example_data.LOCATIONS_22, temperature_max=10., temperature_min=0.1, replicas=4, exchange_steps=50,
+    exchanges=4, max_workers=1, seed=5, distance_calculator=DistanceCalculatorType.HAVERSINE,
+)
+
+
+def test_colder_replica_takes_lower_energy():
+    solver = ParallelTemperingSolver(**SOLVER_ARGUMENTS)
+    solver.plans = [[index] for index in range(solver.replicas)]
+    solver.energies = [40., 30., 20., 10.]
+    solver.exchange(0)
+    # pairs (0, 1) and (2, 3) exchange, the colder replica of each pair always takes the lower energy
+    assert solver.energies == [30., 40., 10., 20.]
+    assert solver.plans == [[1], [0], [3], [2]]
+    assert solver.accepted_exchanges == [1, 0, 1]
+
+
+def test_exchange_probability():
+    solver = ParallelTemperingSolver(**SOLVER_ARGUMENTS)
+    temperatures = solver.temperatures
+    probability = math.exp((1 / temperatures[1] - 1 / temperatures[2]) * -1.)
+    rounds = 2000
+    for _ in range(rounds):
+        solver.energies = [0., 10., 11., 0.]
+        solver.exchange(1)
+    assert solver.accepted_exchanges == [0, pytest.approx(probability * rounds, rel=0.15), 0]
+
+
+def test_solve_returns_best_replica_plan():
+    solver = ParallelTemperingSolver(**SOLVER_ARGUMENTS)
+    plan = solver.solve()
+    assert sorted(plan) == sorted(SOLVER_ARGUMENTS["data"])
+    assert solver.best_energy <= min(solver.energies)
+    solution = Solution(plan=solver.solver.encode_plan(plan))
+    assert solver.best_energy == pytest.approx(solver.solver.objective_function(solution))
+
+
+@pytest.mark.parametrize("key", ["cooling_speed", "cooling_schedule_type", "steps", "initial_temperature"])
+def test_temperature_arguments_are_rejected(key):
+    with pytest.raises(ValueError, match=key):
+        ParallelTemperingSolver(**dict(SOLVER_ARGUMENTS, **{key: 1}))
@@ -0,0 +1,56 @@
+import pytest
+from PIL import Image
+
+from algorithm.annealing import Solution
+from algorithm.trace import Trace
+from data import example_data
+from solvers.distance import DistanceCalculatorType
+from solvers.tsp import MoveType, TSPSolver
+from tests.render import apply_move, frame_indexes, render
+
+
+@pytest.fixture
+def solver():
+    solver = TSPSolver(data=example_data.LOCATIONS_22, steps=50, initial_temperature=100., temperature_min=1.,
+                       cooling_speed=0.95, distance_calculator=DistanceCalculatorType.HAVERSINE, seed=11,
+                       move_probabilities={MoveType.SWAP: 0.2, MoveType.TWO_OPT: 0.5, MoveType.OR_OPT: 0.3},
+                       polish_steps=100, trace=Trace(keyframe_interval=8))
+    solver.solve()
+    return solver
+
+
+def test_trace_replays_accepted_plans(solver):
+    trace = solver.trace
+    assert len(trace.keyframes) > 2
+    for index in range(len(trace)):
+        plan = trace.plan(index, apply_move=apply_move)
+        assert sorted(plan.tolist()) == list(range(22))
+        assert solver.objective_function(Solution(plan=plan.tolist())) == pytest.approx(trace.energy[index])
+    assert trace.plan(len(trace) - 1, apply_move=apply_move).tolist() == solver.solution.plan
+
+
+def test_trace_save_and_load(solver, tmp_path):
+    path = tmp_path.joinpath("run.npz")
+    solver.trace.save(path, coordinates=solver.coordinates)
+    trace = Trace.load(path)
+    assert len(trace) == len(solver.trace)
+    assert trace.keyframe_interval == 8
+    assert list(trace.temperature) == list(solver.trace.temperature)
+    assert list(trace.energy) == list(solver.trace.energy)
+    assert trace.arrays["coordinates"].tolist() == solver.coordinates.tolist()
+    for index in frame_indexes(len(trace), frames=20):
+        assert trace.plan(index, apply_move=apply_move).tolist() == \
+            solver.trace.plan(index, apply_move=apply_move).tolist()
+
+
+def test_frame_indexes_include_first_and_last_solution():
+    assert frame_indexes(10, frames=4).tolist() == [0, 3, 6, 9]
+    assert frame_indexes(3, frames=10).tolist() == [0, 1, 2]
+
+
+def test_render_gif(solver, tmp_path):
+    path, output = tmp_path.joinpath("run.npz"), tmp_path.joinpath("run.gif")
+    solver.trace.save(path, coordinates=solver.coordinates)
+    render(path, output, frames=3, processes=1, dpi=20)
+    with Image.open(output) as image:
+        assert image.n_frames == 3